@@ -0,0 +1,10 @@
+# Регистрирует все модели в метаданных, чтобы связи по строковым именам
+# разрешались и вне FastAPI-приложения (планировщик, консольные команды)
+from auth.models import Role, User  # noqa: F401
+from brand.models import Brand  # noqa: F401
+from cars.models import Car  # noqa: F401
+from customer_cars.models import CustomerCar  # noqa: F401
+from notifications.models import NotificationOutbox  # noqa: F401
+from orders.models import Order, OrderService  # noqa: F401
+from service.models import Service  # noqa: F401
+from revisions.models import TableRevision  # noqa: F401
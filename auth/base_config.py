@@ -2,6 +2,7 @@ from fastapi_users import FastAPIUsers
 from fastapi_users.authentication import CookieTransport, AuthenticationBackend
 from fastapi_users.authentication import JWTStrategy
 
+from auth.cache import CachedJWTStrategy
 from auth.manager import get_user_manager
 from auth.models import User
 from config import SECRET_AUTH
@@ -10,7 +11,7 @@ cookie_transport = CookieTransport(cookie_name="car-wash", cookie_max_age=3600)
 #добавить мета информацию (количество всех записей) при пагинации
 
 def get_jwt_strategy() -> JWTStrategy:
-    return JWTStrategy(secret=SECRET_AUTH, lifetime_seconds=3600)
+    return CachedJWTStrategy(secret=SECRET_AUTH, lifetime_seconds=3600)
 
 
 auth_backend = AuthenticationBackend(
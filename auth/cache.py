@@ -0,0 +1,162 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import jwt
+from fastapi_users import exceptions
+from fastapi_users.authentication import JWTStrategy
+from fastapi_users.jwt import decode_jwt
+from sqlalchemy import func, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth.models import User
+from config import USER_CACHE_MAX_SIZE, USER_CACHE_TTL_SECONDS
+from database import engine
+
+USER_CHANNEL = "user_changed"
+LISTENER_RETRY_SECONDS = 5
+
+
+class UserCache:
+    # LRU по токену с TTL; для инвалидации держим индекс user_id -> токены
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, User]] = OrderedDict()
+        self._tokens_by_user: dict[int, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> Optional[User]:
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, user = entry
+        if expires_at <= time.time():
+            self._remove(token)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return user
+
+    def set(self, token: str, user: User, token_expires_at: Optional[float] = None) -> None:
+        if self.max_size <= 0 or self.ttl_seconds <= 0:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+        self._remove(token)
+        self._entries[token] = (expires_at, self._snapshot(user))
+        self._tokens_by_user.setdefault(user.id, set()).add(token)
+        while len(self._entries) > self.max_size:
+            oldest_token = next(iter(self._entries))
+            self._remove(oldest_token)
+
+    def invalidate_user(self, user_id: int) -> None:
+        for token in self._tokens_by_user.pop(user_id, set()):
+            self._entries.pop(token, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tokens_by_user.clear()
+
+    def _remove(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        tokens = self._tokens_by_user.get(entry[1].id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[entry[1].id]
+
+    @staticmethod
+    def _snapshot(user: User) -> User:
+        # Отвязанная от сессии копия: rollback в чужом запросе не протушит её атрибуты
+        return User(**{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+
+
+# Изменения из приложения доходят до всех воркеров через NOTIFY;
+# правки прямо в БД видны не позже чем через USER_CACHE_TTL_SECONDS
+user_cache = UserCache(max_size=USER_CACHE_MAX_SIZE, ttl_seconds=USER_CACHE_TTL_SECONDS)
+listener_task: Optional[asyncio.Task] = None
+
+
+class CachedJWTStrategy(JWTStrategy):
+    async def read_token(self, token, user_manager):
+        if token is None:
+            return None
+
+        cached_user = user_cache.get(token)
+        if cached_user is not None:
+            return cached_user
+
+        try:
+            data = decode_jwt(token, self.decode_key, self.token_audience, algorithms=[self.algorithm])
+            user_id = data.get("sub")
+            if user_id is None:
+                return None
+        except jwt.PyJWTError:
+            return None
+
+        try:
+            user = await user_manager.get(user_manager.parse_id(user_id))
+        except (exceptions.UserNotExists, exceptions.InvalidID):
+            return None
+
+        user_cache.set(token, user, data.get("exp"))
+        return user
+
+
+async def publish_user_change(session: AsyncSession, user_id: int) -> None:
+    # NOTIFY доставляется при коммите всем воркерам, включая текущий
+    await session.execute(select(func.pg_notify(USER_CHANNEL, str(user_id))))
+
+
+def on_user_notification(connection, pid, channel, payload):
+    user_cache.invalidate_user(int(payload))
+
+
+async def run_user_listener() -> None:
+    while True:
+        try:
+            async with engine.connect() as connection:
+                try:
+                    raw_connection = await connection.get_raw_connection()
+                    await raw_connection.driver_connection.add_listener(USER_CHANNEL, on_user_notification)
+                    while True:
+                        await asyncio.sleep(LISTENER_RETRY_SECONDS)
+                        await raw_connection.driver_connection.execute("SELECT 1")
+                finally:
+                    await connection.invalidate()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"User cache listener failed: {e}")
+        # Пока слушателя не было, изменения могли пройти мимо
+        user_cache.clear()
+        await asyncio.sleep(LISTENER_RETRY_SECONDS)
+
+
+async def start_user_cache_listener() -> None:
+    global listener_task
+    if user_cache.max_size <= 0 or user_cache.ttl_seconds <= 0:
+        return
+    listener_task = asyncio.create_task(run_user_listener())
+
+
+async def stop_user_cache_listener() -> None:
+    global listener_task
+    if listener_task is not None:
+        listener_task.cancel()
+        try:
+            await listener_task
+        except asyncio.CancelledError:
+            pass
+        listener_task = None
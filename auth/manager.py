@@ -1,10 +1,14 @@
 from typing import Optional
 
 from fastapi import Depends, Request
+from fastapi.security import OAuth2PasswordRequestForm
 from fastapi_users import BaseUserManager, IntegerIDMixin, exceptions, models, schemas
 
+from auth.cache import publish_user_change, user_cache
+from auth.hashing import password_hash_pool
 from auth.models import User
 from auth.utils import get_user_db
+from revisions.revision_service import bump_revisions
 
 from config import SECRET_AUTH
 
@@ -16,6 +20,20 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
     async def on_after_register(self, user: User, request: Optional[Request] = None):
         print(f"User {user.id} has registered.")
 
+    async def on_after_update(self, user: User, update_dict: dict, request: Optional[Request] = None):
+        user_cache.invalidate_user(user.id)
+        await self._publish_user_change(user.id)
+
+    async def on_after_delete(self, user: User, request: Optional[Request] = None):
+        user_cache.invalidate_user(user.id)
+        await self._publish_user_change(user.id)
+
+    async def _publish_user_change(self, user_id: int) -> None:
+        # ФИО и email пользователей попадают в ответы по заказам, роль - в проверки доступа других воркеров
+        await publish_user_change(self.user_db.session, user_id)
+        await bump_revisions(self.user_db.session, "user")
+        await self.user_db.session.commit()
+
     async def create(
         self,
         user_create: schemas.UC,
@@ -34,7 +52,7 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
             else user_create.create_update_dict_superuser()
         )
         password = user_dict.pop("password")
-        user_dict["hashed_password"] = self.password_helper.hash(password)
+        user_dict["hashed_password"] = await password_hash_pool.run(self.password_helper.hash, password)
 
         created_user = await self.user_db.create(user_dict)
 
@@ -42,6 +60,26 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
 
         return created_user
 
+    async def authenticate(self, credentials: OAuth2PasswordRequestForm) -> Optional[models.UP]:
+        # То же, что в BaseUserManager, но хеширование не блокирует event loop
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            # Хешируем впустую, чтобы время ответа не выдавало существование email
+            await password_hash_pool.run(self.password_helper.hash, credentials.password)
+            return None
+
+        verified, updated_password_hash = await password_hash_pool.run(
+            self.password_helper.verify_and_update, credentials.password, user.hashed_password
+        )
+        if not verified:
+            return None
+        if updated_password_hash is not None:
+            await self.user_db.update(user, {"hashed_password": updated_password_hash})
+            user_cache.invalidate_user(user.id)
+
+        return user
+
 
 async def get_user_manager(user_db=Depends(get_user_db)):
     yield UserManager(user_db)
@@ -5,9 +5,11 @@ from typing import List
 
 
 from database import get_async_session
+from auth.cache import publish_user_change, user_cache
 from auth.dependencies import require_admin, get_current_user
 from auth.models import User
 from auth.schemas import UserRead
+from revisions.revision_service import bump_revisions
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -44,4 +46,7 @@ async def delete_user(user_id: int, session: AsyncSession = Depends(get_async_se
         raise HTTPException(status_code=404, detail="User not found")
 
     await session.delete(db_user)
+    await publish_user_change(session, user_id)
+    await bump_revisions(session, "user")
     await session.commit()
+    user_cache.invalidate_user(user_id)
@@ -0,0 +1,51 @@
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import prepare_database  # первым: задаёт окружение
+import httpx
+
+from auth.base_config import get_jwt_strategy
+from main import app
+
+
+async def main(orders: int) -> None:
+    data = await prepare_database(orders=0)
+    token = await get_jwt_strategy().write_token(data.users["admin"])
+    payload = [
+        {
+            "customer_car_id": data.customer_car_id,
+            "employee_id": data.users["employee"].id,
+            "services": [{"service_id": service_id} for service_id in data.service_ids],
+        }
+        for _ in range(orders)
+    ]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", cookies={"car-wash": token}) as client:
+        # Прогрев, чтобы первый запрос не платил за компиляцию выражений
+        (await client.post("/orders/", json=payload[0])).raise_for_status()
+        (await client.post("/orders/bulk", json=payload[:1])).raise_for_status()
+
+        started = time.perf_counter()
+        for order in payload:
+            (await client.post("/orders/", json=order)).raise_for_status()
+        single_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        response = await client.post("/orders/bulk", json=payload)
+        response.raise_for_status()
+        bulk_seconds = time.perf_counter() - started
+        assert response.json()["created"] == orders
+
+    print(f"{orders} orders with {len(data.service_ids)} services each")
+    print(f"{'sequential POST /orders/':<28} {single_seconds * 1000:9.1f} ms  {orders / single_seconds:8.0f} orders/s")
+    print(f"{'one POST /orders/bulk':<28} {bulk_seconds * 1000:9.1f} ms  {orders / bulk_seconds:8.0f} orders/s")
+    print(f"speedup x{single_seconds / bulk_seconds:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Пакетное создание заказов против поштучного")
+    parser.add_argument("--orders", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.orders))
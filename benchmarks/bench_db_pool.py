@@ -0,0 +1,68 @@
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import async_session_maker, prepare_database  # первым: задаёт окружение
+import httpx
+from sqlalchemy import select
+
+from auth.base_config import get_jwt_strategy
+from auth.models import User
+
+
+async def run_clients(requests: int, concurrency: int) -> float:
+    # Пул выбирается по DB_USE_NULL_POOL при импорте database, поэтому main импортируется здесь
+    from main import app
+
+    async with async_session_maker() as session:
+        admin = await session.scalar(select(User).where(User.role_id == 1))
+    token = await get_jwt_strategy().write_token(admin)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", cookies={"car-wash": token}) as client:
+        await client.get("/orders/", params={"limit": 20})
+        remaining = requests
+
+        async def client_loop():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                response = await client.get("/orders/", params={"limit": 20})
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+        return requests / (time.perf_counter() - started)
+
+
+def run_worker(null_pool: bool, requests: int, concurrency: int) -> float:
+    env = dict(os.environ, DB_USE_NULL_POOL=str(null_pool).lower())
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_db_pool", "--worker",
+         "--requests", str(requests), "--concurrency", str(concurrency)],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+async def main(requests: int, concurrency: int) -> None:
+    await prepare_database(orders=200)
+    print(f"GET /orders/?limit=20, {requests} requests, {concurrency} concurrent clients")
+    for name, null_pool in (("NullPool", True), ("QueuePool", False)):
+        rps = await asyncio.to_thread(run_worker, null_pool, requests, concurrency)
+        print(f"{name:<12} {rps:8.0f} req/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="GET /orders под NullPool и под пулом соединений")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        print(asyncio.run(run_clients(args.requests, args.concurrency)))
+    else:
+        asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,90 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import socket
+import smtplib
+import time
+
+from benchmarks.common import report  # первым: задаёт окружение
+from aiosmtpd.controller import Controller
+
+from notifications import email_service
+from notifications.email_service import EmailDispatcher, build_order_completed_message
+
+
+class CountingHandler:
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def send_with_new_connection(message) -> None:
+    # Прежний notify_customer: новое соединение на каждое письмо
+    with smtplib.SMTP(email_service.SMTP_HOST, email_service.SMTP_PORT, timeout=30) as smtp:
+        smtp.send_message(message)
+
+
+async def run_one_connection_per_email(emails: int) -> None:
+    for order_id in range(emails):
+        await asyncio.to_thread(send_with_new_connection, build_order_completed_message("c@example.com", "Клиент", order_id))
+
+
+async def run_dispatcher(emails: int, pool_size: int) -> None:
+    dispatcher = EmailDispatcher(pool_size=pool_size, queue_size=emails, max_retries=0, backoff_seconds=0)
+    try:
+        await asyncio.gather(
+            *(
+                dispatcher.send(build_order_completed_message("c@example.com", "Клиент", order_id))
+                for order_id in range(emails)
+            )
+        )
+    finally:
+        await dispatcher.stop()
+
+
+async def timed(run) -> list[float]:
+    # Диспетчер печатает строку на каждое письмо
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        await run()
+        return [time.perf_counter() - started]
+
+
+async def main(emails: int) -> None:
+    handler = CountingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    email_service.SMTP_HOST = controller.hostname
+    email_service.SMTP_PORT = controller.port
+    email_service.SMTP_STARTTLS = False
+    email_service.SMTP_PASS = None
+    try:
+        print(f"{emails} emails to a local aiosmtpd server")
+        report("new connection per email", await timed(lambda: run_one_connection_per_email(emails)), emails, "emails")
+        for pool_size in (1, 2, 4):
+            report(
+                f"dispatcher, pool of {pool_size}",
+                await timed(lambda: run_dispatcher(emails, pool_size)),
+                emails,
+                "emails",
+            )
+    finally:
+        controller.stop()
+    assert handler.received == emails * 4
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Пропускная способность отправки писем")
+    parser.add_argument("--emails", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.emails))
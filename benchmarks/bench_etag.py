@@ -0,0 +1,53 @@
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.common import prepare_database, report  # первым: задаёт окружение
+import httpx
+
+from auth.base_config import get_jwt_strategy
+from main import app
+
+POLLED_PATHS = ("/services/", "/brands/", "/cars/", "/orders/today")
+
+
+async def poll(client: httpx.AsyncClient, path: str, repeats: int, conditional: bool) -> tuple[list[float], int, int]:
+    first = await client.get(path)
+    headers = {"If-None-Match": first.headers["etag"]} if conditional else {}
+    timings = []
+    transferred = 0
+    status_code = first.status_code
+    for _ in range(repeats):
+        started = time.process_time()
+        response = await client.get(path, headers=headers)
+        timings.append(time.process_time() - started)
+        transferred += len(response.content)
+        status_code = response.status_code
+    return timings, transferred, status_code
+
+
+async def main(orders: int, repeats: int) -> None:
+    data = await prepare_database(orders)
+    token = await get_jwt_strategy().write_token(data.users["admin"])
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", cookies={"car-wash": token}) as client:
+        print(f"{repeats} polls per endpoint, {orders} orders today; CPU time per request")
+        for path in POLLED_PATHS:
+            full_timings, full_bytes, _ = await poll(client, path, repeats, conditional=False)
+            cached_timings, cached_bytes, status_code = await poll(client, path, repeats, conditional=True)
+            assert status_code == 304, f"{path}: {status_code}"
+            report(f"GET {path} 200", full_timings)
+            report(f"GET {path} 304", cached_timings)
+            print(
+                f"{'':<36} CPU x{statistics.median(full_timings) / statistics.median(cached_timings):.1f} less, "
+                f"{full_bytes // repeats} -> {cached_bytes // repeats} bytes per poll"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Опрос списков с If-None-Match и без")
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.orders, args.repeats))
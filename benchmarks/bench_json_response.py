@@ -0,0 +1,88 @@
+import argparse
+import asyncio
+import gzip
+import os
+import statistics
+import time
+
+os.environ["FAST_JSON_RESPONSES"] = "true"
+from benchmarks.common import report  # первым: задаёт окружение
+import httpx
+from fastapi import FastAPI
+
+from orders import schemas
+from responses import json_response
+
+
+def build_page(size: int) -> schemas.OrderListResponse:
+    user = schemas.UserBase(id=1, full_name="Иван Иванов Иванович")
+    customer_car = schemas.CustomerCarBase(
+        id=1,
+        year=2020,
+        number="А123ВС",
+        customer=schemas.CustomerBase(id=3, full_name="Пётр Петров Петрович", email="client@example.com"),
+        car=schemas.CarBase(model="Camry", brand="Toyota"),
+    )
+    orders = [
+        schemas.OrderBase(
+            id=index,
+            status=1,
+            start_date="2024-01-01 10:00:00",
+            end_date="2024-01-01 11:00:00",
+            totalTime=60,
+            totalPrice=1500,
+            administrator=user,
+            employee=user,
+            customerCar=customer_car,
+        )
+        for index in range(size)
+    ]
+    return schemas.OrderListResponse(total_count=size, orders=orders, next_cursor=None)
+
+
+def build_app(page: schemas.OrderListResponse) -> FastAPI:
+    app = FastAPI()
+
+    # Стандартный путь: повторная валидация по response_model, jsonable_encoder, json.dumps
+    @app.get("/default", response_model=schemas.OrderListResponse)
+    async def default():
+        return page
+
+    @app.get("/fast", response_model=schemas.OrderListResponse)
+    async def fast():
+        return json_response(page)
+
+    return app
+
+
+async def cpu_per_request(client: httpx.AsyncClient, path: str, repeats: int) -> tuple[list[float], bytes]:
+    response = await client.get(path)
+    timings = []
+    for _ in range(repeats):
+        started = time.process_time()
+        response = await client.get(path)
+        timings.append(time.process_time() - started)
+    return timings, response.content
+
+
+async def main(size: int, repeats: int) -> None:
+    app = build_app(build_page(size))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        default_timings, default_body = await cpu_per_request(client, "/default", repeats)
+        fast_timings, fast_body = await cpu_per_request(client, "/fast", repeats)
+
+    print(f"page of {size} orders, {repeats} requests, CPU time per request")
+    report("response_model + json.dumps", default_timings, 1, "page")
+    report("json_response (pydantic-core)", fast_timings, 1, "page")
+    print(f"speedup x{statistics.median(default_timings) / statistics.median(fast_timings):.1f}")
+    assert default_body == fast_body
+    # Строки страницы одинаковые, поэтому реальные ответы сжимаются хуже
+    print(f"body {len(fast_body)} bytes, gzip {len(gzip.compress(fast_body))} bytes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CPU на сериализацию страницы заказов")
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.size, args.repeats))
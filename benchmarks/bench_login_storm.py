@@ -0,0 +1,91 @@
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.common import async_session_maker, percentile, prepare_database  # первым: задаёт окружение
+import httpx
+from fastapi_users.password import PasswordHelper
+from sqlalchemy import update
+
+from auth.hashing import password_hash_pool
+from auth.models import User
+from main import app
+
+PASSWORD = "bench-password"
+
+
+async def inline_run(func, *args):
+    # Прежнее поведение: хеш считается прямо в event loop
+    return func(*args)
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event) -> list[float]:
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        (await client.get("/services/")).raise_for_status()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+async def login_storm(client: httpx.AsyncClient, email: str, logins: int, concurrency: int) -> None:
+    remaining = logins
+
+    async def login_loop():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            response = await client.post("/auth/login", data={"username": email, "password": PASSWORD})
+            assert response.status_code == 204, response.text
+
+    await asyncio.gather(*(login_loop() for _ in range(concurrency)))
+
+
+async def scenario(client: httpx.AsyncClient, email: str, logins: int, concurrency: int) -> list[float]:
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(client, stop))
+    if logins:
+        await login_storm(client, email, logins, concurrency)
+    else:
+        await asyncio.sleep(2)
+    stop.set()
+    return await probe_task
+
+
+async def main(logins: int, concurrency: int) -> None:
+    data = await prepare_database(orders=0)
+    admin = data.users["admin"]
+    async with async_session_maker() as session:
+        await session.execute(
+            update(User).where(User.id == admin.id).values(hashed_password=PasswordHelper().hash(PASSWORD))
+        )
+        await session.commit()
+
+    print(f"p50/p99 of GET /services/ while {logins} logins run {concurrency} at a time")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        await client.get("/services/")
+        results = {"no logins": await scenario(client, admin.email, 0, concurrency)}
+        results[f"hash pool ({password_hash_pool.max_workers} threads)"] = await scenario(
+            client, admin.email, logins, concurrency
+        )
+        pool_run = password_hash_pool.run
+        password_hash_pool.run = inline_run
+        try:
+            results["hash on event loop"] = await scenario(client, admin.email, logins, concurrency)
+        finally:
+            password_hash_pool.run = pool_run
+
+    for name, latencies in results.items():
+        print(
+            f"{name:<28} p50 {statistics.median(latencies) * 1000:8.1f} ms"
+            f"   p99 {percentile(latencies, 0.99) * 1000:8.1f} ms   ({len(latencies)} probes)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Задержка посторонних запросов во время волны логинов")
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.concurrency))
@@ -0,0 +1,77 @@
+import argparse
+import asyncio
+from datetime import timedelta
+
+from benchmarks.common import async_session_maker, measure, prepare_database, report  # первым: задаёт окружение
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+
+from cars.models import Car
+from customer_cars.models import CustomerCar
+from orders import schemas
+from orders.mapper import order_from_row, select_order_rows
+from orders.models import Order
+
+
+async def orm_orders() -> list[schemas.OrderBase]:
+    # Прежний путь: ORM-объекты через четыре цепочки joinedload, имена и даты в Python
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(Order).options(
+                joinedload(Order.customer_car).joinedload(CustomerCar.user),
+                joinedload(Order.customer_car).joinedload(CustomerCar.car).joinedload(Car.brand),
+                joinedload(Order.employee),
+                joinedload(Order.administrator),
+            )
+        )
+        return [
+            schemas.OrderBase(
+                id=order.id,
+                status=order.status.value,
+                start_date=(order.start_date + timedelta(hours=7)).strftime("%Y-%m-%d %H:%M:%S"),
+                end_date=(order.end_date + timedelta(hours=7)).strftime("%Y-%m-%d %H:%M:%S") if order.end_date else None,
+                totalTime=order.total_time_seconds // 60,
+                totalPrice=order.total_price_kopecks // 100,
+                administrator=schemas.UserBase(
+                    id=order.administrator.id,
+                    full_name=f"{order.administrator.first_name} {order.administrator.last_name} {order.administrator.patronymic}",
+                ),
+                employee=schemas.UserBase(
+                    id=order.employee.id,
+                    full_name=f"{order.employee.first_name} {order.employee.last_name} {order.employee.patronymic}",
+                ),
+                customerCar=schemas.CustomerCarBase(
+                    id=order.customer_car.id,
+                    year=order.customer_car.year,
+                    number=order.customer_car.number,
+                    customer=schemas.CustomerBase(
+                        id=order.customer_car.user.id,
+                        full_name=f"{order.customer_car.user.first_name} {order.customer_car.user.last_name} {order.customer_car.user.patronymic}",
+                        email=order.customer_car.user.email,
+                    ),
+                    car=schemas.CarBase(model=order.customer_car.car.model, brand=order.customer_car.car.brand.name),
+                ),
+            )
+            for order in result.unique().scalars().all()
+        ]
+
+
+async def row_orders() -> list[schemas.OrderBase]:
+    async with async_session_maker() as session:
+        result = await session.execute(select_order_rows())
+        return [order_from_row(row) for row in result.all()]
+
+
+async def main(orders: int, repeats: int) -> None:
+    await prepare_database(orders)
+    print(f"{orders} orders, {repeats} runs")
+    report("ORM + joinedload", await measure(orm_orders, repeats), orders, "rows")
+    report("column projection + order_from_row", await measure(row_orders, repeats), orders, "rows")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OrderBase: ORM-гидратация против проекции колонок")
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.orders, args.repeats))
@@ -0,0 +1,46 @@
+import os
+import statistics
+import time
+
+# Как в tests/conftest.py: окружение задаётся до импорта config
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_PORT", "5432")
+os.environ.setdefault("DB_NAME", "car_wash_test")
+os.environ.setdefault("DB_USER", "postgres")
+os.environ.setdefault("DB_PASS", "postgres")
+os.environ.setdefault("SECRET_AUTH", "bench-secret")
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+
+from config import DB_NAME
+from database import Base, async_session_maker, engine
+from tests.seed import SeedData, seed
+
+
+async def prepare_database(orders: int, services_per_order: int = 2) -> SeedData:
+    # Бенчмарки очищают таблицы, как и тесты
+    if not DB_NAME.endswith("_test"):
+        raise SystemExit(f"DB_NAME={DB_NAME}: нужна отдельная база, имя которой оканчивается на _test")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with async_session_maker() as session:
+        return await seed(session, orders=orders, services_per_order=services_per_order)
+
+
+async def measure(run, repeats: int) -> list[float]:
+    await run()  # прогрев: кэш запросов SQLAlchemy и подготовленные выражения asyncpg
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        await run()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def report(name: str, timings: list[float], items: int = 1, unit: str = "op") -> None:
+    median = statistics.median(timings)
+    print(f"{name:<36} median {median * 1000:9.2f} ms   {items / median:12.0f} {unit}/s")
@@ -3,6 +3,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
 from brand import models, schemas
+from brand.utils import normalize_brand_name
+from catalog.cache import catalog_cache, publish_catalog_change
+
+BRAND_SORT_FIELDS = ("id", "name")
 
 
 class BrandService:
@@ -17,19 +21,33 @@ class BrandService:
         if db_brand:
             raise HTTPException(status_code=400, detail="Такой бренд уже существует")
         
-        db_brand = models.Brand(name=brand_data.name.lower().capitalize())
+        db_brand = models.Brand(name=normalize_brand_name(brand_data.name))
         self.session.add(db_brand)
         
         try:
+            await publish_catalog_change(self.session, "brand")
             await self.session.commit()
         except IntegrityError:
             await self.session.rollback()
             raise HTTPException(status_code=400, detail="Такой бренд уже существует")
         
+        catalog_cache.invalidate("brand")
         await self.session.refresh(db_brand)
         return db_brand
 
     async def get_brands(self, skip: int = 0, limit: int = 10, filter_by: str = None, sort_by: str = None) -> list[models.Brand]:
+        if sort_by and sort_by not in BRAND_SORT_FIELDS:
+            raise HTTPException(status_code=400, detail="Недопустимое поле сортировки")
+
+        brands = await catalog_cache.brands()
+        if brands is not None:
+            if filter_by:
+                needle = filter_by.lower()
+                brands = [brand for brand in brands if needle in brand.name.lower()]
+            if sort_by:
+                brands = sorted(brands, key=lambda brand: getattr(brand, sort_by))
+            return brands[skip:skip + limit]
+
         query = select(models.Brand)
         if filter_by:
             query = query.where(models.Brand.name.ilike(f"%{filter_by}%"))
@@ -42,17 +60,25 @@ class BrandService:
         return brands
 
     async def get_brand_by_id(self, brand_id: int) -> models.Brand:
-        query = select(models.Brand).where(models.Brand.id == brand_id)
-        result = await self.session.execute(query)
-        db_brand = result.scalars().first()
+        if catalog_cache.enabled:
+            db_brand = await catalog_cache.brand_by_id(brand_id)
+        else:
+            query = select(models.Brand).where(models.Brand.id == brand_id)
+            result = await self.session.execute(query)
+            db_brand = result.scalars().first()
         if not db_brand:
             raise HTTPException(status_code=404, detail="Бренд не найден")
         return db_brand
 
     async def get_brand_by_name(self, brand_name: str) -> models.Brand:
-        stmt = select(models.Brand).where(models.Brand.name == brand_name.lower().capitalize())
-        result = await self.session.execute(stmt)
-        db_brand = result.scalars().first()
+        normalized_name = normalize_brand_name(brand_name)
+        brands = await catalog_cache.brands()
+        if brands is not None:
+            db_brand = next((brand for brand in brands if brand.name == normalized_name), None)
+        else:
+            stmt = select(models.Brand).where(models.Brand.name == normalized_name)
+            result = await self.session.execute(stmt)
+            db_brand = result.scalars().first()
         
         if not db_brand:
             raise HTTPException(status_code=404, detail="Бренд не найден")
@@ -70,7 +96,9 @@ class BrandService:
         for key, value in brand_update.dict(exclude_unset=True).items():
             setattr(db_brand, key, value)
 
+        await publish_catalog_change(self.session, "brand")
         await self.session.commit()
+        catalog_cache.invalidate("brand")
         await self.session.refresh(db_brand)
         return db_brand
 
@@ -83,7 +111,9 @@ class BrandService:
             raise HTTPException(status_code=404, detail="Бренд не найден")
 
         await self.session.delete(db_brand)
+        await publish_catalog_change(self.session, "brand")
         await self.session.commit()
+        catalog_cache.invalidate("brand")
 
     async def delete_brand(self, brand_id: int) -> None:
         query = select(models.Brand).where(models.Brand.id == brand_id)
@@ -94,4 +124,6 @@ class BrandService:
             raise HTTPException(status_code=404, detail="Бренд не найден")
 
         await self.session.delete(db_brand)
+        await publish_catalog_change(self.session, "brand")
         await self.session.commit()
+        catalog_cache.invalidate("brand")
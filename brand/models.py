@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Index, Integer, String
 
 from database import Base
 
 
 class Brand(Base):
     __tablename__ = "brand"
+    __table_args__ = (
+        # Поиск подстроки в подсказках; нужно расширение pg_trgm
+        Index("ix_brand_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
 
     id = Column(Integer, primary_key=True)
     name = Column(String, unique=True, nullable=False)
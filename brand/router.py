@@ -1,17 +1,26 @@
 from typing import Annotated, List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import get_async_session
+from database import get_async_session, get_async_read_session
 from brand.schemas import Brand, BrandCreate
 from auth.dependencies import require_admin, require_admin_or_employee_or_client
 from brand.brand_service import BrandService
+from catalog.cache import catalog_revision
+from revisions.conditional import conditional_response, make_etag
+from pydantic import TypeAdapter
+from responses import json_response
 
 router = APIRouter(prefix="/brands", tags=["Brands"])
 
+brand_list_adapter = TypeAdapter(List[Brand])
+
 def get_brand_service(session: AsyncSession = Depends(get_async_session)):
     return BrandService(session)
 
+def get_brand_read_service(session: AsyncSession = Depends(get_async_read_session)):
+    return BrandService(session)
+
 @router.get(
     "/",
     response_model=list[Brand],
@@ -19,18 +28,25 @@ def get_brand_service(session: AsyncSession = Depends(get_async_session)):
 )
 @router.get("/", response_model=List[Brand], dependencies=[Depends(require_admin_or_employee_or_client)])
 async def get_brands(
+    request: Request,
+    response: Response,
     skip: int = 0, 
     limit: int = 10, 
     filter_by: str = Query(None, alias="filter"),
     sort_by: str = Query(None, alias="sort"),
-    brand_service: BrandService = Depends(get_brand_service)
+    brand_service: BrandService = Depends(get_brand_read_service)
 ):
-    return await brand_service.get_brands(skip=skip, limit=limit, filter_by=filter_by, sort_by=sort_by)
+    etag = make_etag("brands", {"brand": await catalog_revision(brand_service.session, "brand")})
+    not_modified = conditional_response(request, response, etag)
+    if not_modified:
+        return not_modified
+    brands = await brand_service.get_brands(skip=skip, limit=limit, filter_by=filter_by, sort_by=sort_by)
+    return json_response(brands, brand_list_adapter, response)
 
 @router.get("/{brand_name}", response_model=Brand, dependencies=[Depends(require_admin_or_employee_or_client)])
 async def get_brand_by_name(
     brand_name: str, 
-    brand_service: BrandService = Depends(get_brand_service)
+    brand_service: BrandService = Depends(get_brand_read_service)
 ):
     return await brand_service.get_brand_by_name(brand_name)
 
@@ -40,7 +56,7 @@ async def get_brand_by_name(
     dependencies=[Depends(require_admin_or_employee_or_client)],
 )
 async def get_brand_by_id(
-    brand_id: int, session: AsyncSession = Depends(get_async_session)
+    brand_id: int, session: AsyncSession = Depends(get_async_read_session)
 ):
     service = BrandService(session)
     return await service.get_brand_by_id(brand_id)
@@ -0,0 +1,2 @@
+def normalize_brand_name(name: str) -> str:
+    return name.lower().capitalize()
@@ -4,12 +4,27 @@ from sqlalchemy.orm import joinedload
 from fastapi import HTTPException
 from cars import models, schemas
 from brand.models import Brand as brand_model
+from catalog.cache import catalog_cache, publish_catalog_change
+
+CAR_SORT_FIELDS = ("id", "model", "brand_id")
 
 class CarService:
     def __init__(self, session: AsyncSession):
         self.session = session
 
     async def get_cars(self, skip: int = 0, limit: int = 10, filter_by: str = None, sort_by: str = None) -> list[models.Car]:
+        if sort_by and sort_by not in CAR_SORT_FIELDS:
+            raise HTTPException(status_code=400, detail="Недопустимое поле сортировки")
+
+        cars = await catalog_cache.cars()
+        if cars is not None:
+            if filter_by:
+                needle = filter_by.lower()
+                cars = [car for car in cars if needle in car.model.lower()]
+            if sort_by:
+                cars = sorted(cars, key=lambda car: getattr(car, sort_by))
+            return cars[skip:skip + limit]
+
         query = select(models.Car).options(joinedload(models.Car.brand))
         if filter_by:
             query = query.where(models.Car.model.ilike(f"%{filter_by}%"))
@@ -38,13 +53,21 @@ class CarService:
 
         db_car = models.Car(**car_data.dict())
         self.session.add(db_car)
+        await publish_catalog_change(self.session, "cars")
         await self.session.commit()
+        catalog_cache.invalidate("cars")
         await self.session.refresh(db_car)
         db_car.brand_name = brand.name
         return db_car
     
 
     async def get_car_by_id(self, car_id: int) -> models.Car:
+        if catalog_cache.enabled:
+            db_car = await catalog_cache.car_by_id(car_id)
+            if not db_car:
+                raise HTTPException(status_code=404, detail="Car not found")
+            return db_car
+
         query = select(models.Car).where(models.Car.id == car_id).options(joinedload(models.Car.brand))
         result = await self.session.execute(query)
         db_car = result.scalars().first()
@@ -71,7 +94,9 @@ class CarService:
         for key, value in car_update.dict(exclude_unset=True).items():
             setattr(db_car, key, value)
 
+        await publish_catalog_change(self.session, "cars")
         await self.session.commit()
+        catalog_cache.invalidate("cars")
         await self.session.refresh(db_car)
         db_car.brand_name = schemas.Car.serialize_brand(db_car.brand)
         return db_car
@@ -85,4 +110,6 @@ class CarService:
             raise HTTPException(status_code=404, detail="Car not found")
 
         await self.session.delete(db_car)
-        await self.session.commit()
\ No newline at end of file
+        await publish_catalog_change(self.session, "cars")
+        await self.session.commit()
+        catalog_cache.invalidate("cars")
\ No newline at end of file
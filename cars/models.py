@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Index, Integer, String, ForeignKey
 from sqlalchemy.orm import relationship
 from database import Base
 
 
 class Car(Base):
     __tablename__ = "cars"
+    __table_args__ = (
+        Index("ix_cars_model_trgm", "model", postgresql_using="gin", postgresql_ops={"model": "gin_trgm_ops"}),
+    )
 
     id = Column(Integer, primary_key=True)
     model = Column(String, unique=True, nullable=False)
@@ -1,27 +1,43 @@
 from typing import Annotated
 from typing import Annotated, List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import get_async_session
+from database import get_async_session, get_async_read_session
 from cars.schemas import CarCreate, Car
 from auth.dependencies import require_admin, require_admin_or_employee_or_client
 from .cars_service import CarService
+from catalog.cache import catalog_revision
+from revisions.conditional import conditional_response, make_etag
+from pydantic import TypeAdapter
+from responses import json_response
 
 router = APIRouter(prefix="/cars", tags=["Cars"])
 
+car_list_adapter = TypeAdapter(List[Car])
+
 def get_car_service(session: AsyncSession = Depends(get_async_session)):
     return CarService(session)
 
+def get_car_read_service(session: AsyncSession = Depends(get_async_read_session)):
+    return CarService(session)
+
 @router.get("/", response_model=List[Car], dependencies=[Depends(require_admin_or_employee_or_client)])
 async def get_cars(
+    request: Request,
+    response: Response,
     skip: int = 0, 
     limit: int = 10, 
     filter_by: str = Query(None, alias="filter"),
     sort_by: str = Query(None, alias="sort"),
-    car_service: CarService = Depends(get_car_service)
+    car_service: CarService = Depends(get_car_read_service)
 ):
-    return await car_service.get_cars(skip=skip, limit=limit, filter_by=filter_by, sort_by=sort_by)
+    etag = make_etag("cars", {"cars": await catalog_revision(car_service.session, "cars")})
+    not_modified = conditional_response(request, response, etag)
+    if not_modified:
+        return not_modified
+    cars = await car_service.get_cars(skip=skip, limit=limit, filter_by=filter_by, sort_by=sort_by)
+    return json_response(cars, car_list_adapter, response)
 
 @router.post(
     "/",
@@ -41,7 +57,7 @@ async def create_car(
     response_model=list[Car],
     dependencies=[Depends(require_admin_or_employee_or_client)],
 )
-async def get_car_by_id(car_id: int, session: AsyncSession = Depends(get_async_session)):
+async def get_car_by_id(car_id: int, session: AsyncSession = Depends(get_async_read_session)):
     service = CarService(session)
     await service.get_car_by_id(car_id)
 
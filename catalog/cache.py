@@ -0,0 +1,202 @@
+import asyncio
+from typing import Callable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from brand.models import Brand
+from cars.models import Car
+from service.models import Service
+from config import CATALOG_CACHE_ENABLED
+from database import async_session_maker, engine
+from revisions.revision_service import bump_revisions, get_revisions
+
+CATALOG_CHANNEL = "catalog_changed"
+CATALOG_TABLES = ("brand", "cars", "services")
+LISTENER_RETRY_SECONDS = 5
+
+
+def affected_catalog_tables(tables) -> set[str]:
+    tables = set(tables or CATALOG_TABLES)
+    if "brand" in tables:
+        # В машинах хранится название бренда
+        tables.add("cars")
+    return tables & set(CATALOG_TABLES)
+
+
+class CatalogCache:
+    # Справочники в памяти процесса; таблица помечается устаревшей и перечитывается при следующем обращении
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.versions = {table: 0 for table in CATALOG_TABLES}
+        self._generations = {table: 0 for table in CATALOG_TABLES}
+        self._stale = set(CATALOG_TABLES)
+        self._lock = asyncio.Lock()
+        self._brands: list[Brand] = []
+        self._brands_by_id: dict[int, Brand] = {}
+        self._cars: list[Car] = []
+        self._cars_by_id: dict[int, Car] = {}
+        self._services: list[Service] = []
+        self._services_by_id: dict[int, Service] = {}
+        self._subscribers: list[Callable[..., None]] = []
+
+    def subscribe(self, callback: Callable[..., None]) -> None:
+        # Производные индексы (подсказки) сбрасываются вместе с кэшем
+        self._subscribers.append(callback)
+
+    def invalidate(self, *tables: str) -> None:
+        for table in affected_catalog_tables(tables):
+            self._generations[table] += 1
+            self._stale.add(table)
+        for callback in self._subscribers:
+            callback(*tables)
+
+    async def brands(self) -> Optional[list[Brand]]:
+        if not await self._ensure_fresh("brand"):
+            return None
+        return self._brands
+
+    async def brand_by_id(self, brand_id: int) -> Optional[Brand]:
+        await self._ensure_fresh("brand")
+        return self._brands_by_id.get(brand_id)
+
+    async def cars(self) -> Optional[list[Car]]:
+        if not await self._ensure_fresh("cars"):
+            return None
+        return self._cars
+
+    async def car_by_id(self, car_id: int) -> Optional[Car]:
+        await self._ensure_fresh("cars")
+        return self._cars_by_id.get(car_id)
+
+    async def services(self) -> Optional[list[Service]]:
+        if not await self._ensure_fresh("services"):
+            return None
+        return self._services
+
+    async def services_by_id(self) -> Optional[dict[int, Service]]:
+        if not await self._ensure_fresh("services"):
+            return None
+        return self._services_by_id
+
+    async def revision(self, table: str) -> Optional[int]:
+        # Проверка версии для ETag - не обращение за данными, в hits/misses не считается
+        if not await self._ensure_fresh(table, count=False):
+            return None
+        return self.versions[table]
+
+    async def load_all(self) -> None:
+        for table in CATALOG_TABLES:
+            await self._ensure_fresh(table, count=False)
+
+    async def _ensure_fresh(self, table: str, count: bool = True) -> bool:
+        if not self.enabled:
+            return False
+        if table not in self._stale:
+            if count:
+                self.hits += 1
+            return True
+        if count:
+            self.misses += 1
+        async with self._lock:
+            if table in self._stale:
+                generation = self._generations[table]
+                async with async_session_maker() as session:
+                    # Ревизию читаем до данных: версия может отстать от данных, но не опередить их
+                    revisions = await get_revisions(session, table)
+                    await self._load(session, table)
+                # Если пока читали пришла инвалидация, таблица остаётся устаревшей
+                if self._generations[table] == generation:
+                    self._stale.discard(table)
+                self.versions[table] = revisions[table]
+        return True
+
+    async def _load(self, session: AsyncSession, table: str) -> None:
+        if table == "brand":
+            result = await session.execute(select(Brand).order_by(Brand.id))
+            self._brands = list(result.scalars().all())
+            self._brands_by_id = {brand.id: brand for brand in self._brands}
+        elif table == "cars":
+            result = await session.execute(select(Car).options(joinedload(Car.brand)).order_by(Car.id))
+            cars = list(result.scalars().all())
+            for car in cars:
+                car.brand_name = car.brand.name if car.brand else None
+            self._cars = cars
+            self._cars_by_id = {car.id: car for car in cars}
+        elif table == "services":
+            result = await session.execute(select(Service).order_by(Service.id))
+            self._services = list(result.scalars().all())
+            self._services_by_id = {service.id: service for service in self._services}
+
+
+catalog_cache = CatalogCache(enabled=CATALOG_CACHE_ENABLED)
+listener_task: Optional[asyncio.Task] = None
+
+
+async def catalog_revision(session: AsyncSession, table: str) -> int:
+    revision = await catalog_cache.revision(table)
+    if revision is not None:
+        return revision
+    revisions = await get_revisions(session, table)
+    return revisions[table]
+
+
+async def publish_catalog_change(session: AsyncSession, *tables: str) -> None:
+    await bump_revisions(session, *affected_catalog_tables(tables))
+    # NOTIFY доставляется при коммите всем воркерам, включая текущий
+    for table in tables:
+        await session.execute(select(func.pg_notify(CATALOG_CHANNEL, table)))
+
+
+def on_catalog_notification(connection, pid, channel, payload):
+    catalog_cache.invalidate(payload)
+
+
+async def run_catalog_listener() -> None:
+    reconnecting = False
+    while True:
+        try:
+            async with engine.connect() as connection:
+                try:
+                    raw_connection = await connection.get_raw_connection()
+                    await raw_connection.driver_connection.add_listener(CATALOG_CHANNEL, on_catalog_notification)
+                    if reconnecting:
+                        # Пока слушателя не было, изменения могли пройти мимо
+                        catalog_cache.invalidate()
+                    while True:
+                        await asyncio.sleep(LISTENER_RETRY_SECONDS)
+                        await raw_connection.driver_connection.execute("SELECT 1")
+                finally:
+                    await connection.invalidate()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Catalog listener failed: {e}")
+        reconnecting = True
+        catalog_cache.invalidate()
+        await asyncio.sleep(LISTENER_RETRY_SECONDS)
+
+
+async def start_catalog_cache() -> None:
+    global listener_task
+    if not catalog_cache.enabled:
+        return
+    try:
+        await catalog_cache.load_all()
+    except Exception as e:
+        print(f"Failed to load catalog cache: {e}")
+    listener_task = asyncio.create_task(run_catalog_listener())
+
+
+async def stop_catalog_cache() -> None:
+    global listener_task
+    if listener_task is not None:
+        listener_task.cancel()
+        try:
+            await listener_task
+        except asyncio.CancelledError:
+            pass
+        listener_task = None
@@ -0,0 +1,213 @@
+import argparse
+import asyncio
+import codecs
+import csv
+import json
+import time
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from brand.models import Brand
+from brand.utils import normalize_brand_name
+from cars.models import Car
+from catalog import schemas
+from catalog.cache import catalog_cache, publish_catalog_change
+from config import CATALOG_IMPORT_BATCH_SIZE
+from database import async_session_maker
+
+IMPORT_FORMATS = ("csv", "jsonl")
+MAX_REPORTED_ERRORS = 100
+READ_CHUNK_SIZE = 64 * 1024
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    # Файл не читается в память целиком: строки отдаются по мере прихода байтов
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+async def read_file_chunks(path: str) -> AsyncIterator[bytes]:
+    with open(path, "rb") as file:
+        while chunk := file.read(READ_CHUNK_SIZE):
+            yield chunk
+
+
+async def parse_rows(lines: AsyncIterator[str], file_format: str) -> AsyncIterator[tuple[int, Optional[dict], Optional[str]]]:
+    header = None
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        if file_format == "jsonl":
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield line_number, None, "Некорректный JSON"
+                continue
+            if not isinstance(row, dict):
+                yield line_number, None, "Ожидается объект с полями brand и model"
+                continue
+            yield line_number, row, None
+            continue
+
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [value.strip().lower() for value in values]
+            if "brand" not in header or "model" not in header:
+                raise HTTPException(status_code=400, detail="В CSV нет колонок brand и model")
+            continue
+        if len(values) != len(header):
+            yield line_number, None, "Неверное число колонок"
+            continue
+        yield line_number, dict(zip(header, values)), None
+
+
+def validate_row(row: dict) -> tuple[Optional[tuple[str, str]], Optional[str]]:
+    brand_name = row.get("brand")
+    model = row.get("model")
+    if not isinstance(brand_name, str) or not isinstance(model, str):
+        return None, "Нужны строковые поля brand и model"
+    brand_name = brand_name.strip()
+    model = model.strip()
+    # Те же правила, что у BrandCreate и BrandService.create_brand
+    if not brand_name.isalpha():
+        return None, "Название бренда может содержать только буквы"
+    if not model:
+        return None, "Пустая модель"
+    return (normalize_brand_name(brand_name), model), None
+
+
+class CatalogImporter:
+    def __init__(self, session: AsyncSession, batch_size: int = CATALOG_IMPORT_BATCH_SIZE):
+        self.session = session
+        self.batch_size = batch_size
+        self._brand_ids: dict[str, int] = {}
+
+    async def import_rows(self, rows: AsyncIterator[tuple[int, Optional[dict], Optional[str]]]) -> schemas.CatalogImportResult:
+        started = time.perf_counter()
+        total = inserted_brands = inserted = skipped = invalid = 0
+        errors = []
+        batch: dict[str, str] = {}
+
+        try:
+            try:
+                async for line_number, row, error in rows:
+                    total += 1
+                    pair = None
+                    if error is None:
+                        pair, error = validate_row(row)
+                    if error is not None:
+                        invalid += 1
+                        if len(errors) < MAX_REPORTED_ERRORS:
+                            errors.append(schemas.CatalogImportError(line=line_number, error=error))
+                        continue
+
+                    brand_name, model = pair
+                    if model in batch:
+                        skipped += 1
+                        continue
+                    batch[model] = brand_name
+                    if len(batch) >= self.batch_size:
+                        batch_brands, batch_cars = await self._flush(batch)
+                        inserted_brands += batch_brands
+                        inserted += batch_cars
+                        skipped += len(batch) - batch_cars
+                        batch = {}
+            except UnicodeDecodeError:
+                raise HTTPException(status_code=400, detail="Файл должен быть в кодировке UTF-8")
+
+            if batch:
+                batch_brands, batch_cars = await self._flush(batch)
+                inserted_brands += batch_brands
+                inserted += batch_cars
+                skipped += len(batch) - batch_cars
+        finally:
+            # Кэши сбрасываются один раз на весь импорт, а не на каждую пачку
+            if inserted_brands or inserted:
+                # После ошибки транзакция могла остаться прерванной; закоммиченные пачки не откатываются
+                await self.session.rollback()
+                await publish_catalog_change(self.session, "brand")
+                await self.session.commit()
+                catalog_cache.invalidate("brand")
+
+        seconds = time.perf_counter() - started
+        return schemas.CatalogImportResult(
+            total=total,
+            inserted_brands=inserted_brands,
+            inserted=inserted,
+            skipped=skipped,
+            invalid=invalid,
+            seconds=round(seconds, 3),
+            rows_per_second=round(total / seconds, 1) if seconds else 0.0,
+            errors=errors,
+        )
+
+    async def _flush(self, batch: dict[str, str]) -> tuple[int, int]:
+        inserted_brands = await self._ensure_brands(set(batch.values()))
+        # Модель уникальна во всём справочнике: существующие строки молча пропускаются
+        result = await self.session.execute(
+            insert(Car)
+            .values([{"model": model, "brand_id": self._brand_ids[brand_name]} for model, brand_name in batch.items()])
+            .on_conflict_do_nothing(index_elements=[Car.model])
+            .returning(Car.id)
+        )
+        inserted = len(result.all())
+        await self.session.commit()
+        return inserted_brands, inserted
+
+    async def _ensure_brands(self, brand_names: set[str]) -> int:
+        missing = sorted(name for name in brand_names if name not in self._brand_ids)
+        if not missing:
+            return 0
+        result = await self.session.execute(
+            insert(Brand)
+            .values([{"name": name} for name in missing])
+            .on_conflict_do_nothing(index_elements=[Brand.name])
+            .returning(Brand.id, Brand.name)
+        )
+        created = result.all()
+        self._brand_ids.update({name: brand_id for brand_id, name in created})
+
+        existing = [name for name in missing if name not in self._brand_ids]
+        if existing:
+            result = await self.session.execute(select(Brand.id, Brand.name).where(Brand.name.in_(existing)))
+            self._brand_ids.update({name: brand_id for brand_id, name in result.all()})
+        return len(created)
+
+
+async def import_file(path: str, file_format: str) -> schemas.CatalogImportResult:
+    async with async_session_maker() as session:
+        importer = CatalogImporter(session)
+        return await importer.import_rows(parse_rows(iter_lines(read_file_chunks(path)), file_format))
+
+
+if __name__ == "__main__":
+    import all_models  # noqa: F401
+
+    parser = argparse.ArgumentParser(description="Импорт брендов и моделей из CSV или JSONL")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=IMPORT_FORMATS)
+    args = parser.parse_args()
+    file_format = args.format or ("jsonl" if args.path.endswith((".jsonl", ".ndjson")) else "csv")
+
+    result = asyncio.run(import_file(args.path, file_format))
+    print(
+        f"Imported {result.total} rows in {result.seconds}s ({result.rows_per_second} rows/s): "
+        f"{result.inserted} inserted, {result.inserted_brands} new brands, "
+        f"{result.skipped} skipped, {result.invalid} invalid"
+    )
+    for error in result.errors:
+        print(f"line {error.line}: {error.error}")
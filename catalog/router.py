@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_async_session, get_async_read_session
+from auth.dependencies import require_admin, require_employee_or_admin
+from catalog import schemas
+from catalog.importer import CatalogImporter, iter_lines, parse_rows
+from catalog.suggest_service import SuggestService
+
+router = APIRouter(prefix="/catalog", tags=["Catalog"])
+
+
+def get_suggest_service(session: AsyncSession = Depends(get_async_read_session)):
+    return SuggestService(session)
+
+
+@router.get(
+    "/suggest",
+    response_model=schemas.SuggestResponse,
+    # В подсказках номера машин всех клиентов - только для сотрудников
+    dependencies=[Depends(require_employee_or_admin)],
+)
+async def suggest(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    suggest_service: SuggestService = Depends(get_suggest_service),
+):
+    return await suggest_service.suggest(q, limit=limit)
+
+
+@router.post(
+    "/import",
+    response_model=schemas.CatalogImportResult,
+    dependencies=[Depends(require_admin)],
+)
+async def import_catalog(
+    request: Request,
+    file_format: str = Query("csv", alias="format", pattern="^(csv|jsonl)$"),
+    session: AsyncSession = Depends(get_async_session),
+):
+    # Тело читается потоком: CSV с заголовком brand,model или JSONL {"brand": ..., "model": ...}
+    importer = CatalogImporter(session)
+    return await importer.import_rows(parse_rows(iter_lines(request.stream()), file_format))
@@ -0,0 +1,29 @@
+from typing import List
+from pydantic import BaseModel
+
+
+class Suggestion(BaseModel):
+    type: str  # brand, car или plate
+    id: int
+    label: str
+
+
+class SuggestResponse(BaseModel):
+    query: str
+    items: List[Suggestion]
+
+
+class CatalogImportError(BaseModel):
+    line: int
+    error: str
+
+
+class CatalogImportResult(BaseModel):
+    total: int
+    inserted_brands: int
+    inserted: int
+    skipped: int  # модель уже есть в справочнике или повторяется в файле
+    invalid: int
+    seconds: float
+    rows_per_second: float
+    errors: List[CatalogImportError]
@@ -0,0 +1,119 @@
+import asyncio
+from bisect import bisect_left
+from typing import Optional
+
+from sqlalchemy import select
+
+from customer_cars.models import CustomerCar
+from config import CATALOG_CACHE_ENABLED
+from database import async_session_maker
+from catalog.cache import catalog_cache
+
+SUGGEST_KINDS = ("brand", "car", "plate")
+# Таблица -> раздел подсказок, который из неё строится
+SUGGEST_SOURCES = {"brand": "brand", "cars": "car", "customer_cars": "plate"}
+
+
+def normalize_text(value: str) -> str:
+    return " ".join(value.split()).casefold()
+
+
+def normalize_plate(value: str) -> str:
+    return "".join(value.split()).casefold()
+
+
+class PrefixIndex:
+    # Отсортированный массив ключей: поиск по префиксу - bisect и проход вперёд
+    def __init__(self, entries: list[tuple[str, int, str]]):
+        entries.sort()
+        self._keys = [key for key, _, _ in entries]
+        self._entries = entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def search(self, prefix: str, limit: int) -> list[tuple[int, str]]:
+        results = []
+        seen = set()
+        position = bisect_left(self._keys, prefix)
+        while position < len(self._keys) and len(results) < limit:
+            if not self._keys[position].startswith(prefix):
+                break
+            _, item_id, label = self._entries[position]
+            if item_id not in seen:
+                seen.add(item_id)
+                results.append((item_id, label))
+            position += 1
+        return results
+
+
+class SuggestIndex:
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._indexes: dict[str, PrefixIndex] = {}
+        self._generations = {kind: 0 for kind in SUGGEST_KINDS}
+        self._stale = set(SUGGEST_KINDS)
+        self._lock = asyncio.Lock()
+
+    def invalidate(self, *tables: str) -> None:
+        tables = set(tables or SUGGEST_SOURCES)
+        if "brand" in tables:
+            # Название бренда входит в ключи моделей
+            tables.add("cars")
+        for table in tables:
+            kind = SUGGEST_SOURCES.get(table)
+            if kind:
+                self._generations[kind] += 1
+                self._stale.add(kind)
+
+    async def search(self, kind: str, prefix: str, limit: int) -> Optional[list[tuple[int, str]]]:
+        index = await self._ensure_fresh(kind)
+        if index is None:
+            return None
+        return index.search(prefix, limit)
+
+    async def load_all(self) -> None:
+        for kind in SUGGEST_KINDS:
+            await self._ensure_fresh(kind)
+
+    async def _ensure_fresh(self, kind: str) -> Optional[PrefixIndex]:
+        if not self.enabled:
+            return None
+        if kind not in self._stale:
+            return self._indexes[kind]
+        async with self._lock:
+            if kind in self._stale:
+                generation = self._generations[kind]
+                self._indexes[kind] = PrefixIndex(await self._build(kind))
+                if self._generations[kind] == generation:
+                    self._stale.discard(kind)
+        return self._indexes[kind]
+
+    async def _build(self, kind: str) -> list[tuple[str, int, str]]:
+        if kind == "brand":
+            brands = await catalog_cache.brands() or []
+            return [(normalize_text(brand.name), brand.id, brand.name) for brand in brands]
+        if kind == "car":
+            entries = []
+            for car in await catalog_cache.cars() or []:
+                label = f"{car.brand_name} {car.model}" if car.brand_name else car.model
+                # Модель находится и сама по себе, и вместе с брендом: "camry", "toyota camry"
+                entries.append((normalize_text(car.model), car.id, label))
+                entries.append((normalize_text(label), car.id, label))
+            return entries
+        async with async_session_maker() as session:
+            result = await session.execute(select(CustomerCar.id, CustomerCar.number))
+            return [(normalize_plate(number), customer_car_id, number) for customer_car_id, number in result.all()]
+
+
+suggest_index = SuggestIndex(enabled=CATALOG_CACHE_ENABLED)
+catalog_cache.subscribe(suggest_index.invalidate)
+
+
+async def start_suggest_index() -> None:
+    if not suggest_index.enabled:
+        return
+    try:
+        await suggest_index.load_all()
+    except Exception as e:
+        print(f"Failed to load suggest index: {e}")
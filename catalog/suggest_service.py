@@ -0,0 +1,88 @@
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from brand.models import Brand
+from cars.models import Car
+from customer_cars.models import CustomerCar
+from catalog import schemas
+from catalog.suggest import SUGGEST_KINDS, normalize_plate, normalize_text, suggest_index
+
+# Короче трёх символов триграммный индекс не помогает
+SUBSTRING_MIN_LENGTH = 3
+
+
+def like_pattern(value: str, prefix_only: bool = False) -> str:
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%" if prefix_only else f"%{escaped}%"
+
+
+class SuggestService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def suggest(self, q: str, limit: int = 10) -> schemas.SuggestResponse:
+        text = normalize_text(q)
+        items = []
+        if text:
+            matches_by_kind = {}
+            db_kinds = []
+            for kind in SUGGEST_KINDS:
+                prefix = normalize_plate(text) if kind == "plate" else text
+                matches = await suggest_index.search(kind, prefix, limit)
+                if matches is None:
+                    db_kinds.append(kind)
+                elif not matches and len(text) >= SUBSTRING_MIN_LENGTH:
+                    # Совпадения в середине строки добирает Postgres по триграммному индексу,
+                    # только когда по префиксу не нашлось ничего
+                    db_kinds.append(kind)
+                matches_by_kind[kind] = matches or []
+
+            if db_kinds:
+                # Все недостающие виды - одним запросом, а не круг до БД на каждый
+                prefix_only = len(text) < SUBSTRING_MIN_LENGTH
+                matches_by_kind.update(await self._search_db(db_kinds, text, limit, prefix_only))
+
+            for kind in SUGGEST_KINDS:
+                items.extend(
+                    schemas.Suggestion(type=kind, id=item_id, label=label)
+                    for item_id, label in matches_by_kind[kind]
+                )
+        return schemas.SuggestResponse(query=q, items=items)
+
+    async def _search_db(
+        self, kinds: list[str], text: str, limit: int, prefix_only: bool = False
+    ) -> dict[str, list[tuple[int, str]]]:
+        queries = []
+        for kind in kinds:
+            value = text
+            if kind == "brand":
+                column = Brand.name
+                query = select(Brand.id, Brand.name)
+            elif kind == "car":
+                column = Car.model
+                query = select(Car.id, func.concat_ws(" ", Brand.name, Car.model)).join(Brand, Car.brand_id == Brand.id)
+            else:
+                # Номер сравнивается без пробелов, как в индексе подсказок
+                column = func.replace(CustomerCar.number, " ", "")
+                query = select(CustomerCar.id, CustomerCar.number)
+                value = normalize_plate(text)
+
+            order = (func.length(column), column)
+            if not prefix_only:
+                # Совпадения с начала строки - выше совпадений в середине
+                order = (~column.ilike(like_pattern(value, prefix_only=True), escape="\\"), *order)
+            queries.append(
+                query.add_columns(
+                    literal(kind).label("kind"),
+                    func.row_number().over(order_by=order).label("rank"),
+                )
+                .where(column.ilike(like_pattern(value, prefix_only), escape="\\"))
+                .order_by(*order)
+                .limit(limit)
+            )
+
+        result = await self.session.execute(union_all(*queries))
+        matches = {kind: [] for kind in kinds}
+        for item_id, label, kind, _ in sorted(result.all(), key=lambda row: row[3]):
+            matches[kind].append((item_id, label))
+        return matches
@@ -8,7 +8,65 @@ DB_PORT = os.environ.get("DB_PORT")
 DB_NAME = os.environ.get("DB_NAME")
 DB_USER = os.environ.get("DB_USER")
 DB_PASS = os.environ.get("DB_PASS")
+DB_REPLICA_HOST = os.environ.get("DB_REPLICA_HOST")
+DB_REPLICA_PORT = os.environ.get("DB_REPLICA_PORT", DB_PORT)
+DB_REPLICA_NAME = os.environ.get("DB_REPLICA_NAME", DB_NAME)
+DB_REPLICA_USER = os.environ.get("DB_REPLICA_USER", DB_USER)
+DB_REPLICA_PASS = os.environ.get("DB_REPLICA_PASS", DB_PASS)
+READ_YOUR_WRITES_SECONDS = int(os.environ.get("READ_YOUR_WRITES_SECONDS", 0))
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_USE_NULL_POOL = os.environ.get("DB_USE_NULL_POOL", "false").lower() == "true"
+DB_STATEMENT_CACHE_SIZE = int(os.environ.get("DB_STATEMENT_CACHE_SIZE", 100))
+DB_ECHO = os.environ.get("DB_ECHO", "false").lower() == "true"
+DB_APPLICATION_NAME = os.environ.get("DB_APPLICATION_NAME", "car-wash")
 SMTP_EMAIL = os.environ.get("SMTP_EMAIL")
 SMTP_PASS = os.environ.get("SMTP_PASS")
+SMTP_HOST = os.environ.get("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.environ.get("SMTP_PORT", 587))
+SMTP_STARTTLS = os.environ.get("SMTP_STARTTLS", "true").lower() == "true"
+SMTP_POOL_SIZE = int(os.environ.get("SMTP_POOL_SIZE", 2))
+SMTP_QUEUE_SIZE = int(os.environ.get("SMTP_QUEUE_SIZE", 1000))
+SMTP_MAX_RETRIES = int(os.environ.get("SMTP_MAX_RETRIES", 3))
+SMTP_RETRY_BACKOFF_SECONDS = float(os.environ.get("SMTP_RETRY_BACKOFF_SECONDS", 1))
+
+OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE", 100))
+OUTBOX_POLL_SECONDS = float(os.environ.get("OUTBOX_POLL_SECONDS", 2))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", 5))
+OUTBOX_RETRY_BACKOFF_SECONDS = float(os.environ.get("OUTBOX_RETRY_BACKOFF_SECONDS", 30))
+OUTBOX_LEASE_SECONDS = float(os.environ.get("OUTBOX_LEASE_SECONDS", 300))  # Сколько захваченная пачка недоступна другим воркерам
+OUTBOX_RETENTION_DAYS = int(os.environ.get("OUTBOX_RETENTION_DAYS", 7))  # Сколько хранить отправленные и упавшие письма, 0 - не чистить
+OUTBOX_PURGE_MINUTES = int(os.environ.get("OUTBOX_PURGE_MINUTES", 60))
 
 SECRET_AUTH = os.environ.get("SECRET_AUTH")
+USER_CACHE_TTL_SECONDS = int(os.environ.get("USER_CACHE_TTL_SECONDS", 60))
+USER_CACHE_MAX_SIZE = int(os.environ.get("USER_CACHE_MAX_SIZE", 10000))
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", 4))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", 64))
+
+CATALOG_CACHE_ENABLED = os.environ.get("CATALOG_CACHE_ENABLED", "true").lower() == "true"
+CATALOG_IMPORT_BATCH_SIZE = int(os.environ.get("CATALOG_IMPORT_BATCH_SIZE", 1000))
+
+FAST_JSON_RESPONSES = os.environ.get("FAST_JSON_RESPONSES", "false").lower() == "true"
+GZIP_MINIMUM_SIZE = int(os.environ.get("GZIP_MINIMUM_SIZE", 0))  # 0 - без сжатия
+
+# Профилирование: без PROFILING_ENABLED middleware не подключается вовсе
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "false").lower() == "true"
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", 0))
+PROFILING_HEADER_TOKEN = os.environ.get("PROFILING_HEADER_TOKEN")
+PROFILING_INTERVAL_MS = float(os.environ.get("PROFILING_INTERVAL_MS", 5))
+PROFILING_DIR = os.environ.get("PROFILING_DIR", "profiles")
+PROFILING_MAX_FILES = int(os.environ.get("PROFILING_MAX_FILES", 50))
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "false").lower() == "true"
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")  # Bearer-токен для /metrics, без него эндпоинт закрыт
+SQL_STATS_ENABLED = os.environ.get("SQL_STATS_ENABLED", "false").lower() == "true"
+SQL_DUPLICATE_WARNING_THRESHOLD = int(os.environ.get("SQL_DUPLICATE_WARNING_THRESHOLD", 5))
+
+ORDER_RECONCILE_MINUTES = int(os.environ.get("ORDER_RECONCILE_MINUTES", 10))
+SCHEDULER_ENABLED = os.environ.get("SCHEDULER_ENABLED", "true").lower() == "true"
+SCHEDULER_LOCK_ID = int(os.environ.get("SCHEDULER_LOCK_ID", 720_001))
+SCHEDULER_LEADER_RETRY_SECONDS = float(os.environ.get("SCHEDULER_LEADER_RETRY_SECONDS", 5))
@@ -4,6 +4,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from . import models, schemas
+from revisions.revision_service import bump_revisions
+from catalog.cache import catalog_cache, publish_catalog_change
 
 
 class CustomerCarService:
@@ -15,7 +17,10 @@ class CustomerCarService:
     ) -> models.CustomerCar:
         db_customer_car = models.CustomerCar(**customer_car_data.dict())
         self.session.add(db_customer_car)
+        await bump_revisions(self.session, "customer_cars")
+        await publish_catalog_change(self.session, "customer_cars")
         await self.session.commit()
+        catalog_cache.invalidate("customer_cars")
         await self.session.refresh(db_customer_car)
         return db_customer_car
 
@@ -55,7 +60,10 @@ class CustomerCarService:
         for key, value in customer_car_update.dict(exclude_unset=True).items():
             setattr(db_customer_car, key, value)
 
+        await bump_revisions(self.session, "customer_cars")
+        await publish_catalog_change(self.session, "customer_cars")
         await self.session.commit()
+        catalog_cache.invalidate("customer_cars")
         await self.session.refresh(db_customer_car)
         return db_customer_car
 
@@ -70,4 +78,7 @@ class CustomerCarService:
             raise HTTPException(status_code=404, detail="CustomerCar not found")
 
         await self.session.delete(customer_car)
+        await bump_revisions(self.session, "customer_cars")
+        await publish_catalog_change(self.session, "customer_cars")
         await self.session.commit()
+        catalog_cache.invalidate("customer_cars")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Index, Integer, String, ForeignKey, func
 from sqlalchemy.orm import relationship
 
 from database import Base
@@ -6,7 +6,6 @@ from database import Base
 
 class CustomerCar(Base):
     __tablename__ = "customer_cars"
-
     id = Column(Integer, primary_key=True)
     year = Column(Integer, nullable=False)
     number = Column(String, nullable=False)
@@ -16,3 +15,12 @@ class CustomerCar(Base):
     car = relationship("Car", backref="customer_cars")
     user = relationship("User", backref="customer_cars")
     orders = relationship("Order", back_populates="customer_car")
+
+
+# Подсказки ищут номер без пробелов; нужно расширение pg_trgm
+Index(
+    "ix_customer_cars_number_trgm",
+    func.replace(CustomerCar.number, " ", "").label("number_compact"),
+    postgresql_using="gin",
+    postgresql_ops={"number_compact": "gin_trgm_ops"},
+)
@@ -3,7 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from . import schemas
-from database import get_async_session
+from database import get_async_session, get_async_read_session
 from .customer_cars_service import CustomerCarService
 from auth.dependencies import require_admin, require_admin_or_employee_or_client
 
@@ -16,6 +16,12 @@ def get_customer_car_service(
     return CustomerCarService(session)
 
 
+def get_customer_car_read_service(
+    session: AsyncSession = Depends(get_async_read_session),
+):
+    return CustomerCarService(session)
+
+
 @router.post(
     "/",
     status_code=status.HTTP_201_CREATED,
@@ -37,7 +43,7 @@ async def create_customer_car(
 async def read_customer_cars(
     skip: int = 0,
     limit: int = 100,
-    customer_car_service: CustomerCarService = Depends(get_customer_car_service),
+    customer_car_service: CustomerCarService = Depends(get_customer_car_read_service),
 ):
     return await customer_car_service.get_customer_cars(skip=skip, limit=limit)
 
@@ -49,7 +55,7 @@ async def read_customer_cars(
 )
 async def read_customer_car_by_id(
     customer_car_id: int,
-    customer_car_service: CustomerCarService = Depends(get_customer_car_service),
+    customer_car_service: CustomerCarService = Depends(get_customer_car_read_service),
 ):
     return await customer_car_service.get_customer_car_by_id(customer_car_id)
 
@@ -1,26 +1,123 @@
+import time
 from typing import AsyncGenerator
 
+from fastapi import Request, Response
+
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 
 # from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 from sqlalchemy.ext.asyncio import AsyncAttrs
-from config import DB_HOST, DB_NAME, DB_PASS, DB_PORT, DB_USER
+from config import (
+    DB_HOST,
+    DB_NAME,
+    DB_PASS,
+    DB_PORT,
+    DB_USER,
+    DB_REPLICA_HOST,
+    DB_REPLICA_NAME,
+    DB_REPLICA_PASS,
+    DB_REPLICA_PORT,
+    DB_REPLICA_USER,
+    READ_YOUR_WRITES_SECONDS,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+    DB_USE_NULL_POOL,
+    DB_STATEMENT_CACHE_SIZE,
+    DB_ECHO,
+    DB_APPLICATION_NAME,
+)
 
 
 DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+REPLICA_DATABASE_URL = (
+    f"postgresql+asyncpg://{DB_REPLICA_USER}:{DB_REPLICA_PASS}@{DB_REPLICA_HOST}:{DB_REPLICA_PORT}/{DB_REPLICA_NAME}"
+)
+READ_YOUR_WRITES_COOKIE = "car-wash-rw"
 
 
 class Base(AsyncAttrs, DeclarativeBase):  # тут хранятся все метаданные
     pass
 
 
-engine = create_async_engine(DATABASE_URL, echo=True, poolclass=NullPool)
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    # Сколько запрос ждал свободное соединение; наблюдателей подключает monitoring
+    wait_observers: list = []
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            for observer in self.wait_observers:
+                observer(self, time.perf_counter() - started)
+
+
+def create_engine_from_config(url: str):
+    options = {
+        "echo": DB_ECHO,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "connect_args": {
+            "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+            "server_settings": {"application_name": DB_APPLICATION_NAME},
+        },
+    }
+    if DB_USE_NULL_POOL:
+        # Для внешнего пулера (pgbouncer): своё соединение на каждую сессию
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            poolclass=TimedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+    return create_async_engine(url, **options)
+
+
+engine = create_engine_from_config(DATABASE_URL)
 async_session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# Без DB_REPLICA_HOST чтение идёт в тот же пул, что и запись
+replica_engine = create_engine_from_config(REPLICA_DATABASE_URL) if DB_REPLICA_HOST else engine
+async_read_session_maker = sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False)
+
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
         yield session
+
+
+def get_read_session_maker(request: Request) -> sessionmaker:
+    # Недавно писавший клиент читает с primary, пока реплика может отставать
+    return async_session_maker if has_recent_write(request) else async_read_session_maker
+
+
+async def get_async_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    async with get_read_session_maker(request)() as session:
+        yield session
+
+
+def mark_recent_write(response: Response) -> None:
+    if READ_YOUR_WRITES_SECONDS > 0:
+        response.set_cookie(
+            READ_YOUR_WRITES_COOKIE,
+            str(int(time.time()) + READ_YOUR_WRITES_SECONDS),
+            max_age=READ_YOUR_WRITES_SECONDS,
+            httponly=True,
+        )
+
+
+def has_recent_write(request: Request) -> bool:
+    if READ_YOUR_WRITES_SECONDS <= 0:
+        return False
+    try:
+        return int(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
@@ -1,5 +1,6 @@
 from typing import Annotated
-from fastapi import Depends, FastAPI
+from fastapi import Depends, FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
 from auth.dependencies import fastapi_users
 
 from auth.base_config import auth_backend
@@ -11,12 +12,55 @@ from auth.router import router as user_router
 from service.router import router as service_router
 from customer_cars.router import router as customer_cars_router
 from orders.router import router as orders_router
-from scheduler import scheduler
+from scheduler import start_scheduler, shutdown_scheduler
+from config import SCHEDULER_ENABLED, READ_YOUR_WRITES_SECONDS, GZIP_MINIMUM_SIZE, SQL_STATS_ENABLED, METRICS_ENABLED, PROFILING_ENABLED
+from database import mark_recent_write
+from notifications.email_service import email_dispatcher
+from notifications.outbox import start_outbox_drainer, stop_outbox_drainer
+from auth.hashing import password_hash_pool
+from auth.cache import start_user_cache_listener, stop_user_cache_listener
+from catalog.cache import start_catalog_cache, stop_catalog_cache
+from catalog.suggest import start_suggest_index
+from catalog.router import router as catalog_router
+from monitoring.sql_stats import install_sql_stats, sql_stats_middleware
+from monitoring.metrics import metrics_middleware
+from monitoring.router import install_metrics, router as metrics_router
+from monitoring.profiling import ProfilingMiddleware, router as profiling_router
 
 fastapi_users = fastapi_users
 
 app = FastAPI(title="Car wash service")
 
+
+async def read_your_writes(request: Request, call_next):
+    response = await call_next(request)
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        mark_recent_write(response)
+    return response
+
+# Профилировщик добавляется первым, то есть оказывается самым внутренним: выше по цепочке
+# BaseHTTPMiddleware запускают call_next в отдельной задаче
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+    app.include_router(profiling_router)
+
+if READ_YOUR_WRITES_SECONDS > 0:
+    app.middleware("http")(read_your_writes)
+
+if SQL_STATS_ENABLED:
+    install_sql_stats()
+    app.middleware("http")(sql_stats_middleware)
+
+if METRICS_ENABLED:
+    install_metrics()
+    app.middleware("http")(metrics_middleware)
+    app.include_router(metrics_router)
+
+if GZIP_MINIMUM_SIZE > 0:
+    # Маленькие ответы не сжимаем: на них gzip тратит больше, чем экономит
+    app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE)
+
+
 app.include_router(
     fastapi_users.get_auth_router(auth_backend),
     prefix="/auth", #username = email.
@@ -33,11 +77,23 @@ app.include_router(
 
 @app.on_event("startup")
 async def startup_event():
-    scheduler.start()
+    await start_catalog_cache()
+    await start_suggest_index()
+    await start_user_cache_listener()
+    await email_dispatcher.start()
+    await start_outbox_drainer()
+    if SCHEDULER_ENABLED:
+        await start_scheduler()
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    scheduler.shutdown()
+    if SCHEDULER_ENABLED:
+        await shutdown_scheduler()
+    await stop_outbox_drainer()
+    await email_dispatcher.stop()
+    await stop_catalog_cache()
+    await stop_user_cache_listener()
+    password_hash_pool.shutdown()
 
 app.include_router(brands_router)
 app.include_router(cars_router)
@@ -45,3 +101,4 @@ app.include_router(user_router)
 app.include_router(service_router)
 app.include_router(customer_cars_router)
 app.include_router(orders_router)
+app.include_router(catalog_router)
@@ -0,0 +1,168 @@
+import asyncio
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel, Field
+
+from auth.dependencies import require_admin
+from config import (
+    PROFILING_DIR,
+    PROFILING_HEADER_TOKEN,
+    PROFILING_INTERVAL_MS,
+    PROFILING_MAX_FILES,
+    PROFILING_SAMPLE_RATE,
+)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+PROFILE_SUFFIX = ".collapsed"
+
+
+def collapse_stack(frame) -> str:
+    # Формат collapsed stacks (flamegraph.pl, speedscope): корень;...;лист
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    # Поток-сэмплер снимает стек потока event loop и засчитывает его задаче, которая
+    # сейчас выполняется. Пока профилируемых запросов нет, потока тоже нет
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self._sessions: dict[asyncio.Task, Counter] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+
+    def start(self, task: asyncio.Task) -> Counter:
+        samples = Counter()
+        with self._lock:
+            self._sessions[task] = samples
+            if self._thread is None:
+                self._loop = task.get_loop()
+                self._loop_thread_id = threading.get_ident()
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+        return samples
+
+    def stop(self, task: asyncio.Task) -> Counter:
+        with self._lock:
+            return self._sessions.pop(task, Counter())
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval_seconds)
+            with self._lock:
+                if not self._sessions:
+                    self._thread = None
+                    return
+                samples = self._sessions.get(asyncio.current_task(self._loop))
+                if samples is None:
+                    continue
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is not None:
+                    samples[collapse_stack(frame)] += 1
+
+
+class ProfilingSettings(BaseModel):
+    sample_rate: float = Field(0.0, ge=0.0, le=1.0)
+
+
+settings = ProfilingSettings(sample_rate=PROFILING_SAMPLE_RATE)
+sampler = StackSampler(PROFILING_INTERVAL_MS / 1000)
+
+
+def header_requested(scope) -> bool:
+    if not PROFILING_HEADER_TOKEN:
+        return False
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            return hmac.compare_digest(value, PROFILING_HEADER_TOKEN.encode())
+    return False
+
+
+def profile_name(scope) -> str:
+    slug = re.sub(r"[^a-zA-Z0-9]+", "_", scope["path"]).strip("_") or "root"
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() % 1_000_000:06d}-{scope['method']}-{slug[:60]}"
+
+
+def write_profile(name: str, samples: Counter, duration_ms: float) -> None:
+    os.makedirs(PROFILING_DIR, exist_ok=True)
+    path = os.path.join(PROFILING_DIR, f"{name}-{duration_ms:.0f}ms{PROFILE_SUFFIX}")
+    with open(path, "w") as file:
+        for stack, count in samples.most_common():
+            file.write(f"{stack} {count}\n")
+
+    # Ротация: храним только последние PROFILING_MAX_FILES профилей
+    profiles = sorted(
+        (entry for entry in os.scandir(PROFILING_DIR) if entry.name.endswith(PROFILE_SUFFIX)),
+        key=lambda entry: entry.stat().st_mtime,
+    )
+    for entry in profiles[:-PROFILING_MAX_FILES]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+
+
+class ProfilingMiddleware:
+    # Чистый ASGI, а не BaseHTTPMiddleware: обработчик выполняется в той же задаче,
+    # и сэмплер может отличить этот запрос от остальных
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (
+            header_requested(scope) or (settings.sample_rate and random.random() < settings.sample_rate)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        name = profile_name(scope)
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(PROFILE_ID_HEADER, name.encode())]
+            await send(message)
+
+        task = asyncio.current_task()
+        sampler.start(task)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            samples = sampler.stop(task)
+            duration_ms = (time.perf_counter() - started) * 1000
+            if samples:
+                try:
+                    await asyncio.to_thread(write_profile, name, samples, duration_ms)
+                except OSError as e:
+                    print(f"Failed to write profile {name}: {e}")
+
+
+router = APIRouter(prefix="/admin/profiling", tags=["Monitoring"])
+
+
+@router.get("/", response_model=ProfilingSettings, dependencies=[Depends(require_admin)])
+async def get_profiling_settings():
+    return settings
+
+
+@router.put("/", response_model=ProfilingSettings, dependencies=[Depends(require_admin)])
+async def update_profiling_settings(update: ProfilingSettings):
+    # Настройка действует на текущий процесс
+    settings.sample_rate = update.sample_rate
+    return settings
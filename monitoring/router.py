@@ -0,0 +1,88 @@
+import hmac
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from auth.cache import user_cache
+from auth.hashing import password_hash_pool
+from catalog.cache import catalog_cache
+from config import METRICS_TOKEN
+from database import TimedQueuePool, engine, replica_engine
+from monitoring.metrics import Counter, Gauge, db_pool_wait_seconds, registry
+from notifications.email_service import email_dispatcher
+
+router = APIRouter(tags=["Monitoring"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class CollectedCounter(Counter):
+    # Счётчик, который уже ведёт сам объект (кэш, пул); значение снимается при опросе
+    def __init__(self, name: str, help_text: str, collect):
+        super().__init__(name, help_text)
+        self.collect = collect
+
+    def render(self) -> list[str]:
+        self._values[()] = self.collect()
+        return super().render()
+
+
+def engines() -> dict:
+    if replica_engine is engine:
+        return {"primary": engine}
+    return {"primary": engine, "replica": replica_engine}
+
+
+def pool_stat(method: str):
+    def collect():
+        values = {}
+        for name, target_engine in engines().items():
+            pool = target_engine.sync_engine.pool
+            # У NullPool (внешний pgbouncer) этой статистики нет
+            if isinstance(pool, TimedQueuePool):
+                values[(name,)] = getattr(pool, method)()
+        return values
+    return collect
+
+
+def observe_pool_wait(pool, seconds: float) -> None:
+    name = "replica" if replica_engine is not engine and pool is replica_engine.sync_engine.pool else "primary"
+    db_pool_wait_seconds.observe(seconds, name)
+
+
+def install_metrics() -> None:
+    if observe_pool_wait in TimedQueuePool.wait_observers:
+        return
+    TimedQueuePool.wait_observers.append(observe_pool_wait)
+    if not METRICS_TOKEN:
+        print("METRICS_TOKEN is not set, /metrics will reject every request")
+
+    registry.register(Gauge("db_pool_size", "Configured pool size", ("engine",), collect=pool_stat("size")))
+    registry.register(Gauge("db_pool_checked_out", "Connections in use", ("engine",), collect=pool_stat("checkedout")))
+    registry.register(Gauge("db_pool_checked_in", "Idle connections in the pool", ("engine",), collect=pool_stat("checkedin")))
+    # Отрицательное значение - сколько ещё соединений можно открыть до pool_size
+    registry.register(Gauge("db_pool_overflow", "Overflow connections", ("engine",), collect=pool_stat("overflow")))
+
+    registry.register(Gauge("email_queue_depth", "Messages waiting for an SMTP worker", collect=lambda: email_dispatcher.queue_depth))
+    registry.register(Gauge("password_hash_queue_depth", "Hash jobs waiting for a worker", collect=lambda: password_hash_pool.queue_depth))
+    registry.register(Gauge("password_hash_running", "Hash jobs running", collect=lambda: password_hash_pool.running))
+    registry.register(CollectedCounter("user_cache_hits_total", "Authenticated user cache hits", lambda: user_cache.hits))
+    registry.register(CollectedCounter("user_cache_misses_total", "Authenticated user cache misses", lambda: user_cache.misses))
+    registry.register(CollectedCounter("catalog_cache_hits_total", "Catalog cache hits", lambda: catalog_cache.hits))
+    registry.register(CollectedCounter("catalog_cache_misses_total", "Catalog cache misses", lambda: catalog_cache.misses))
+
+
+def require_metrics_token(authorization: str = Header(None)):
+    # Без заданного токена метрики не отдаются никому
+    scheme, _, token = (authorization or "").partition(" ")
+    if (
+        not METRICS_TOKEN
+        or scheme.lower() != "bearer"
+        or not hmac.compare_digest(token.encode(), METRICS_TOKEN.encode())
+    ):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Требуется токен метрик")
+
+
+@router.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
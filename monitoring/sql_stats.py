@@ -0,0 +1,123 @@
+import json
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from fastapi import Request
+from sqlalchemy import event
+
+from config import SQL_DUPLICATE_WARNING_THRESHOLD
+from database import engine, replica_engine
+
+SERVER_TIMING_QUERIES = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries"')
+PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|\?")
+PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    # IN (...) разворачивается в разное число параметров, а шаблон должен быть один
+    shape = PLACEHOLDER.sub("?", statement)
+    shape = PLACEHOLDER_LIST.sub("?...", shape)
+    return WHITESPACE.sub(" ", shape).strip()
+
+
+class SqlStats:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter[str] = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+    @property
+    def max_repeats(self) -> int:
+        return max(self.shapes.values(), default=0)
+
+
+current_sql_stats: ContextVar[Optional[SqlStats]] = ContextVar("current_sql_stats", default=None)
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_sql_stats.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_sql_stats.get()
+    if stats is not None and conn.info.get("query_started"):
+        stats.record(statement, time.perf_counter() - conn.info["query_started"].pop())
+
+
+def install_sql_stats() -> None:
+    # Контекст запроса доходит до событий движка: greenlet SQLAlchemy наследует contextvars задачи
+    for target in {engine.sync_engine, replica_engine.sync_engine}:
+        if not event.contains(target, "before_cursor_execute", before_cursor_execute):
+            event.listen(target, "before_cursor_execute", before_cursor_execute)
+            event.listen(target, "after_cursor_execute", after_cursor_execute)
+
+
+async def sql_stats_middleware(request: Request, call_next):
+    stats = SqlStats()
+    token = current_sql_stats.set(stats)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        current_sql_stats.reset(token)
+    duration_ms = (time.perf_counter() - started) * 1000
+    db_ms = stats.seconds * 1000
+
+    response.headers.append(
+        "Server-Timing", f'db;dur={db_ms:.2f};desc="{stats.count} queries", app;dur={duration_ms:.2f}'
+    )
+    print(json.dumps({
+        "event": "request",
+        "method": request.method,
+        "path": request.url.path,
+        "status": response.status_code,
+        "duration_ms": round(duration_ms, 2),
+        "db_queries": stats.count,
+        "db_ms": round(db_ms, 2),
+        "db_max_repeats": stats.max_repeats,
+    }))
+    for shape, count in stats.repeated(SQL_DUPLICATE_WARNING_THRESHOLD):
+        print(f"WARNING possible N+1 in {request.method} {request.url.path}: {count} x {shape[:200]}")
+    return response
+
+
+@contextmanager
+def count_queries(max_queries: Optional[int] = None) -> Iterator[SqlStats]:
+    # Для тестов сервисов: with count_queries(3): await service.get_orders(...)
+    stats = SqlStats()
+    token = current_sql_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_sql_stats.reset(token)
+    if max_queries is not None and stats.count > max_queries:
+        raise AssertionError(f"Expected at most {max_queries} queries, got {stats.count}: {list(stats.shapes)}")
+
+
+def queries_from_response(response) -> int:
+    match = SERVER_TIMING_QUERIES.search(response.headers.get("server-timing", ""))
+    if match is None:
+        raise AssertionError("No SQL stats in Server-Timing header; is SQL_STATS_ENABLED on?")
+    return int(match.group(1))
+
+
+def assert_max_queries(response, max_queries: int) -> None:
+    # Для тестов эндпоинтов через TestClient: приложение работает в другом потоке,
+    # поэтому число запросов берётся из заголовка Server-Timing
+    count = queries_from_response(response)
+    if count > max_queries:
+        raise AssertionError(f"Expected at most {max_queries} queries, got {count}")
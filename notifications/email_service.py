@@ -2,26 +2,164 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import asyncio
-from config import SMTP_EMAIL, SMTP_PASS
+import time
+from typing import Optional
+from config import (
+    SMTP_EMAIL,
+    SMTP_PASS,
+    SMTP_HOST,
+    SMTP_PORT,
+    SMTP_STARTTLS,
+    SMTP_POOL_SIZE,
+    SMTP_QUEUE_SIZE,
+    SMTP_MAX_RETRIES,
+    SMTP_RETRY_BACKOFF_SECONDS,
+)
+from monitoring.metrics import email_send_duration_seconds
 
 
-async def notify_customer(user, order_id):
-    await asyncio.sleep(0)  # Эмуляция асинхронной работы
+def is_temporary_smtp_error(error: Exception) -> bool:
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPException):
+        return False
+    # SMTPException наследует OSError, поэтому сетевые ошибки проверяются последними
+    return isinstance(error, OSError)
 
+
+class SmtpConnection:
+    # Блокирующее соединение smtplib; вызывается только из потока через asyncio.to_thread
+    def __init__(self):
+        self._smtp: Optional[smtplib.SMTP] = None
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=30)
+        if SMTP_STARTTLS:
+            smtp.starttls()
+        if SMTP_PASS:
+            smtp.login(SMTP_EMAIL, SMTP_PASS)
+        return smtp
+
+    def send(self, message: MIMEMultipart) -> None:
+        if self._smtp is None:
+            self._smtp = self._connect()
+        try:
+            self._smtp.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            # Сервер закрыл простаивающее соединение: переподключаемся один раз
+            self._smtp = self._connect()
+            self._smtp.send_message(message)
+
+    def close(self) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        self._smtp = None
+
+
+class EmailDispatcher:
+    def __init__(self, pool_size: int, queue_size: int, max_retries: int, backoff_seconds: float):
+        self.pool_size = pool_size
+        self.queue_size = queue_size
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list[asyncio.Task] = []
+        self._connections: list[SmtpConnection] = []
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._connections = [SmtpConnection() for _ in range(self.pool_size)]
+        self._workers = [
+            asyncio.create_task(self._worker(connection)) for connection in self._connections
+        ]
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        for connection in self._connections:
+            await asyncio.to_thread(connection.close)
+        self._workers = []
+        self._connections = []
+        self._queue = None
+
+    async def enqueue(self, message: MIMEMultipart) -> None:
+        # Ждёт свободного места в очереди: так работает backpressure
+        await self._ensure_started()
+        await self._queue.put((message, None, self.max_retries))
+
+    async def send(self, message: MIMEMultipart, retry: bool = True) -> None:
+        # retry=False - одна попытка, повторами управляет вызывающий (outbox)
+        await self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((message, future, self.max_retries if retry else 0))
+        await future
+
+    async def _ensure_started(self) -> None:
+        if self._queue is None:
+            await self.start()
+
+    async def _worker(self, connection: SmtpConnection) -> None:
+        while True:
+            message, future, max_retries = await self._queue.get()
+            started = time.perf_counter()
+            try:
+                await self._deliver(connection, message, max_retries)
+            except Exception as e:
+                email_send_duration_seconds.observe(time.perf_counter() - started, "failed")
+                if future is None:
+                    print(f"Failed to send email to {message['To']}: {e}")
+                elif not future.done():
+                    future.set_exception(e)
+            else:
+                email_send_duration_seconds.observe(time.perf_counter() - started, "sent")
+                print(f"Email sent to {message['To']}")
+                if future is not None and not future.done():
+                    future.set_result(None)
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, connection: SmtpConnection, message: MIMEMultipart, max_retries: int) -> None:
+        attempt = 0
+        while True:
+            try:
+                await asyncio.to_thread(connection.send, message)
+                return
+            except Exception as e:
+                await asyncio.to_thread(connection.close)
+                if attempt >= max_retries or not is_temporary_smtp_error(e):
+                    raise
+                await asyncio.sleep(self.backoff_seconds * 2 ** attempt)
+                attempt += 1
+
+
+email_dispatcher = EmailDispatcher(
+    pool_size=SMTP_POOL_SIZE,
+    queue_size=SMTP_QUEUE_SIZE,
+    max_retries=SMTP_MAX_RETRIES,
+    backoff_seconds=SMTP_RETRY_BACKOFF_SECONDS,
+)
+
+
+def build_order_completed_message(email: str, first_name: str, order_id: int) -> MIMEMultipart:
     msg = MIMEMultipart()
     msg["From"] = SMTP_EMAIL
-    msg["To"] = user.email
+    msg["To"] = email
     msg["Subject"] = f"Заказ #{order_id} выполнен"
 
-    body = f"Dear {user.first_name},\n\nВаш заказ с номером #{order_id} был выполнен"
+    body = f"Dear {first_name},\n\nВаш заказ с номером #{order_id} был выполнен"
     msg.attach(MIMEText(body, "plain"))
+    return msg
 
-    try:
-        with smtplib.SMTP("smtp.gmail.com", 587) as server:
-            server.starttls()
-            server.login(SMTP_EMAIL, SMTP_PASS)
-            text = msg.as_string()
-            server.sendmail(SMTP_EMAIL, user.email, text)
-            print(f"Email sent to {user.email}")
-    except Exception as e:
-        print(f"Failed to send email: {e}")
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, DateTime, Enum, Index, text
+from datetime import datetime
+import enum
+from database import Base
+
+
+class OutboxStatus(enum.Enum):
+    pending = 1
+    sent = 2
+    failed = 3
+
+
+class NotificationOutbox(Base):
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        Index(
+            "ix_notification_outbox_pending_available_at",
+            "available_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    order_id = Column(Integer, nullable=False)
+    email = Column(String, nullable=False)
+    first_name = Column(String, nullable=False)
+    status = Column(Enum(OutboxStatus), nullable=False, default=OutboxStatus.pending)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
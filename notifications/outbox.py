@@ -0,0 +1,148 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import (
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_POLL_SECONDS,
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_LEASE_SECONDS,
+    OUTBOX_RETENTION_DAYS,
+    OUTBOX_RETRY_BACKOFF_SECONDS,
+)
+from database import async_session_maker
+from notifications.email_service import (
+    build_order_completed_message,
+    email_dispatcher,
+    is_temporary_smtp_error,
+)
+from notifications.models import NotificationOutbox, OutboxStatus
+
+
+drainer_task: Optional[asyncio.Task] = None
+drainer_wakeup = asyncio.Event()
+
+
+def wake_outbox_drainer() -> None:
+    drainer_wakeup.set()
+
+
+async def drain_outbox(session: AsyncSession, batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    # Захват: сдвигаем available_at на срок аренды и сразу коммитим, чтобы не держать
+    # блокировки и соединение, пока идёт SMTP. SKIP LOCKED - воркеры не ждут друг друга
+    claimed_ids = (
+        select(NotificationOutbox.id)
+        .where(
+            NotificationOutbox.status == OutboxStatus.pending,
+            NotificationOutbox.available_at <= datetime.utcnow(),
+        )
+        .order_by(NotificationOutbox.available_at, NotificationOutbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    result = await session.execute(
+        update(NotificationOutbox.__table__)
+        .where(NotificationOutbox.id.in_(claimed_ids.scalar_subquery()))
+        .values(
+            available_at=datetime.utcnow() + timedelta(seconds=OUTBOX_LEASE_SECONDS),
+            attempts=NotificationOutbox.attempts + 1,
+        )
+        .returning(
+            NotificationOutbox.id,
+            NotificationOutbox.order_id,
+            NotificationOutbox.email,
+            NotificationOutbox.first_name,
+            NotificationOutbox.attempts,
+        )
+    )
+    entries = result.all()
+    await session.commit()
+    if not entries:
+        return 0
+
+    # Повторы dispatcher'а отключены: единственная политика повторов - attempts в outbox
+    outcomes = await asyncio.gather(
+        *(
+            email_dispatcher.send(
+                build_order_completed_message(entry.email, entry.first_name, entry.order_id), retry=False
+            )
+            for entry in entries
+        ),
+        return_exceptions=True,
+    )
+
+    now = datetime.utcnow()
+    marks = []
+    for entry, outcome in zip(entries, outcomes):
+        mark = {
+            "id": entry.id,
+            "status": OutboxStatus.pending,
+            "sent_at": None,
+            "last_error": None if outcome is None else str(outcome),
+            "available_at": now,
+        }
+        if outcome is None:
+            mark["status"] = OutboxStatus.sent
+            mark["sent_at"] = now
+        elif entry.attempts >= OUTBOX_MAX_ATTEMPTS or not is_temporary_smtp_error(outcome):
+            mark["status"] = OutboxStatus.failed
+        else:
+            mark["available_at"] = now + timedelta(
+                seconds=OUTBOX_RETRY_BACKOFF_SECONDS * 2 ** (entry.attempts - 1)
+            )
+        marks.append(mark)
+
+    await session.execute(update(NotificationOutbox), marks)
+    await session.commit()
+    return len(entries)
+
+
+async def purge_outbox(session: AsyncSession, retention_days: int = OUTBOX_RETENTION_DAYS) -> int:
+    # Без чистки таблица растёт бесконечно. Для sent/failed available_at - время последней попытки
+    if retention_days <= 0:
+        return 0
+    result = await session.execute(
+        delete(NotificationOutbox).where(
+            NotificationOutbox.status != OutboxStatus.pending,
+            NotificationOutbox.available_at < datetime.utcnow() - timedelta(days=retention_days),
+        )
+    )
+    await session.commit()
+    return result.rowcount
+
+
+async def run_outbox_drainer() -> None:
+    while True:
+        drained = 0
+        try:
+            async with async_session_maker() as session:
+                drained = await drain_outbox(session)
+        except Exception as e:
+            print(f"Failed to drain notification outbox: {e}")
+
+        if drained < OUTBOX_BATCH_SIZE:
+            try:
+                await asyncio.wait_for(drainer_wakeup.wait(), OUTBOX_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            drainer_wakeup.clear()
+
+
+async def start_outbox_drainer() -> None:
+    global drainer_task
+    if drainer_task is None:
+        drainer_task = asyncio.create_task(run_outbox_drainer())
+
+
+async def stop_outbox_drainer() -> None:
+    global drainer_task
+    if drainer_task is not None:
+        drainer_task.cancel()
+        try:
+            await drainer_task
+        except asyncio.CancelledError:
+            pass
+        drainer_task = None
@@ -0,0 +1,108 @@
+import asyncio
+
+from sqlalchemy import func, select, text, update
+
+import all_models  # noqa: F401
+from database import async_session_maker
+from orders.models import Order, OrderService
+from service.models import Service
+from revisions.revision_service import bump_revisions
+
+BATCH_SIZE = 1000
+
+# create_all не меняет существующие таблицы: колонки снимков и уникальность добавляются здесь
+SCHEMA_UPGRADE = (
+    "ALTER TABLE order_service ADD COLUMN IF NOT EXISTS price_kopecks INTEGER",
+    "ALTER TABLE order_service ADD COLUMN IF NOT EXISTS time_seconds INTEGER",
+    "ALTER TABLE orders ADD COLUMN IF NOT EXISTS total_time_seconds INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE orders ADD COLUMN IF NOT EXISTS total_price_kopecks INTEGER NOT NULL DEFAULT 0",
+    # Прежний create_order допускал повтор услуги в заказе: остаётся первая строка
+    """
+    DELETE FROM order_service AS duplicate
+    USING order_service AS kept
+    WHERE duplicate.order_id = kept.order_id
+      AND duplicate.service_id = kept.service_id
+      AND duplicate.id > kept.id
+    """,
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_order_service_order_id_service_id') THEN
+            ALTER TABLE order_service
+                ADD CONSTRAINT uq_order_service_order_id_service_id UNIQUE (order_id, service_id);
+        END IF;
+    END $$
+    """,
+)
+
+
+async def upgrade_order_schema(connection) -> None:
+    # Коммит за вызывающим: вся схема меняется одной транзакцией
+    for statement in SCHEMA_UPGRADE:
+        await connection.execute(text(statement))
+
+
+async def backfill_order_totals(batch_size: int = BATCH_SIZE) -> int:
+    async with async_session_maker() as session:
+        result = await session.execute(select(func.min(Order.id), func.max(Order.id)))
+        min_id, max_id = result.one()
+        if min_id is None:
+            return 0
+
+        updated = 0
+        for batch_start in range(min_id, max_id + 1, batch_size):
+            batch_end = batch_start + batch_size
+
+            # Старые строки заказа получают цену и время по текущему прайсу
+            await session.execute(
+                update(OrderService)
+                .where(
+                    OrderService.service_id == Service.id,
+                    OrderService.order_id >= batch_start,
+                    OrderService.order_id < batch_end,
+                    (OrderService.price_kopecks.is_(None)) | (OrderService.time_seconds.is_(None)),
+                )
+                .values(
+                    price_kopecks=func.coalesce(OrderService.price_kopecks, Service.price_kopecks),
+                    time_seconds=func.coalesce(OrderService.time_seconds, Service.time_seconds),
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+            totals = (
+                select(
+                    OrderService.order_id,
+                    func.coalesce(func.sum(OrderService.time_seconds), 0).label("time_seconds"),
+                    func.coalesce(func.sum(OrderService.price_kopecks), 0).label("price_kopecks"),
+                )
+                .where(OrderService.order_id >= batch_start, OrderService.order_id < batch_end)
+                .group_by(OrderService.order_id)
+                .subquery()
+            )
+            result = await session.execute(
+                update(Order)
+                .where(Order.id == totals.c.order_id)
+                .values(
+                    total_time_seconds=totals.c.time_seconds,
+                    total_price_kopecks=totals.c.price_kopecks,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await bump_revisions(session, "orders")
+            await session.commit()
+            updated += result.rowcount
+            print(f"Backfilled orders {batch_start}..{batch_end - 1}")
+
+        return updated
+
+
+async def main() -> None:
+    async with async_session_maker() as session:
+        await upgrade_order_schema(session)
+        await session.commit()
+    count = await backfill_order_totals()
+    print(f"Updated totals for {count} orders")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,110 @@
+import asyncio
+import heapq
+from datetime import datetime
+from typing import Optional
+
+DEADLINES_CHANNEL = "order_deadlines"
+NOTIFY_PAYLOAD_LIMIT = 7900  # NOTIFY принимает не больше 8000 байт
+
+
+def encode_deadline_changes(changes: list[tuple[int, Optional[datetime]]]) -> list[str]:
+    payloads = []
+    items = []
+    size = 0
+    for order_id, end_date in changes:
+        item = f"{order_id}={end_date.isoformat() if end_date else ''}"
+        if items and size + len(item) + 1 > NOTIFY_PAYLOAD_LIMIT:
+            payloads.append(",".join(items))
+            items = []
+            size = 0
+        items.append(item)
+        size += len(item) + 1
+    if items:
+        payloads.append(",".join(items))
+    return payloads
+
+
+class DeadlineQueue:
+    # Min-куча (end_date, order_id); устаревшие записи отбрасываются лениво
+    def __init__(self):
+        self._heap: list[tuple[datetime, int]] = []
+        self._deadlines: dict[int, datetime] = {}
+        self._changed = asyncio.Event()
+        self._reload_touched: Optional[set[int]] = None
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def push(self, order_id: int, end_date: Optional[datetime]) -> None:
+        if end_date is None:
+            return
+        previous_next = self.next_deadline()
+        self._touch(order_id)
+        self._deadlines[order_id] = end_date
+        heapq.heappush(self._heap, (end_date, order_id))
+        if previous_next is None or end_date < previous_next:
+            self._changed.set()
+
+    def discard(self, order_id: int) -> None:
+        self._touch(order_id)
+        self._deadlines.pop(order_id, None)
+
+    def _touch(self, order_id: int) -> None:
+        if self._reload_touched is not None:
+            self._reload_touched.add(order_id)
+
+    def begin_reload(self) -> None:
+        # Запоминает заказы, изменённые пока из БД читается снимок
+        self._reload_touched = set()
+
+    def abort_reload(self) -> None:
+        self._reload_touched = None
+
+    def merge_reload(self, deadlines: dict[int, datetime]) -> None:
+        # Снимок не перетирает изменения, пришедшие во время его чтения
+        touched = self._reload_touched or set()
+        self._reload_touched = None
+        for order_id in list(self._deadlines):
+            if order_id not in deadlines and order_id not in touched:
+                del self._deadlines[order_id]
+        for order_id, end_date in deadlines.items():
+            if order_id not in touched:
+                self._deadlines[order_id] = end_date
+        self._heap = [(end_date, order_id) for order_id, end_date in self._deadlines.items()]
+        heapq.heapify(self._heap)
+        self._changed.set()
+
+    def apply_notification(self, payload: str) -> None:
+        for item in payload.split(","):
+            order_id, _, end_date = item.partition("=")
+            if end_date:
+                self.push(int(order_id), datetime.fromisoformat(end_date))
+            else:
+                self.discard(int(order_id))
+
+    def next_deadline(self) -> Optional[datetime]:
+        while self._heap:
+            end_date, order_id = self._heap[0]
+            if self._deadlines.get(order_id) == end_date:
+                return end_date
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self, now: datetime) -> list[int]:
+        due = []
+        while (next_deadline := self.next_deadline()) is not None and next_deadline <= now:
+            _, order_id = heapq.heappop(self._heap)
+            self._touch(order_id)
+            del self._deadlines[order_id]
+            due.append(order_id)
+        return due
+
+    async def wait(self, timeout: Optional[float]) -> None:
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._changed.clear()
+
+
+deadline_queue = DeadlineQueue()
@@ -0,0 +1,89 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import Select, select
+from sqlalchemy.orm import sessionmaker
+
+from brand.models import Brand
+from cars.models import Car
+from customer_cars.models import CustomerCar
+from database import async_read_session_maker
+from orders.mapper import Administrator, Customer, Employee, full_name, join_order_relations, local_time
+from orders.models import Order, OrderStatus
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+EXPORT_BATCH_SIZE = 1000
+
+# Только плоские колонки: без ORM-объектов и OrderBase на каждую строку
+EXPORT_COLUMNS = (
+    Order.id.label("id"),
+    Order.status.label("status"),
+    local_time(Order.start_date).label("start_date"),
+    local_time(Order.end_date).label("end_date"),
+    Order.total_time_seconds.label("total_time_seconds"),
+    Order.total_price_kopecks.label("total_price_kopecks"),
+    CustomerCar.number.label("car_number"),
+    Brand.name.label("brand"),
+    Car.model.label("model"),
+    Customer.id.label("customer_id"),
+    full_name(Customer).label("customer"),
+    Customer.email.label("customer_email"),
+    full_name(Employee).label("employee"),
+    full_name(Administrator).label("administrator"),
+)
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+
+def build_export_query(
+    date_from: Optional[datetime] = None, date_to: Optional[datetime] = None, status: Optional[int] = None
+) -> Select:
+    query = join_order_relations(select(*EXPORT_COLUMNS)).order_by(Order.start_date, Order.id)
+    if date_from is not None:
+        query = query.where(Order.start_date >= date_from)
+    if date_to is not None:
+        query = query.where(Order.start_date < date_to)
+    if status is not None:
+        try:
+            query = query.where(Order.status == OrderStatus(status))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Некорректный статус заказа")
+    return query
+
+
+def serialize_row(row) -> dict:
+    data = row._asdict()
+    data["status"] = row.status.value
+    return data
+
+
+def encode_ndjson(rows) -> str:
+    return "".join(json.dumps(serialize_row(row), ensure_ascii=False) + "\n" for row in rows)
+
+
+def encode_csv(rows, header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    if header:
+        writer.writeheader()
+    writer.writerows(serialize_row(row) for row in rows)
+    return buffer.getvalue()
+
+
+async def stream_orders_export(
+    query: Select, file_format: str, session_maker: sessionmaker = async_read_session_maker
+) -> AsyncIterator[str]:
+    # Своя сессия: зависимость get_async_session закрывается раньше, чем отдаётся тело ответа.
+    # Роутер передаёт фабрику из get_read_session_maker, чтобы учесть cookie read-your-writes
+    async with session_maker() as session:
+        result = await session.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        if file_format == "csv":
+            yield encode_csv([], header=True)
+        async for rows in result.partitions():
+            yield encode_csv(rows) if file_format == "csv" else encode_ndjson(rows)
@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+from sqlalchemy import Interval, Select, func, literal, select
+from sqlalchemy.orm import aliased
+
+from auth.models import User
+from brand.models import Brand
+from cars.models import Car
+from customer_cars.models import CustomerCar
+from orders import schemas
+from orders.models import Order
+
+LOCAL_TIME_OFFSET = timedelta(hours=7)
+LOCAL_TIME_FORMAT = "YYYY-MM-DD HH24:MI:SS"  # то же, что strftime('%Y-%m-%d %H:%M:%S')
+
+Customer = aliased(User)
+Employee = aliased(User)
+Administrator = aliased(User)
+
+
+def full_name(user):
+    return func.concat_ws(" ", user.first_name, user.last_name, user.patronymic)
+
+
+def local_time(column):
+    return func.to_char(column + literal(LOCAL_TIME_OFFSET, Interval()), LOCAL_TIME_FORMAT)
+
+
+# Ровно те колонки, из которых собирается OrderBase; имена и даты готовит Postgres
+ORDER_ROW_COLUMNS = (
+    Order.id.label("id"),
+    Order.status.label("status"),
+    local_time(Order.start_date).label("start_date"),
+    local_time(Order.end_date).label("end_date"),
+    (Order.total_time_seconds // 60).label("total_time"),
+    (Order.total_price_kopecks // 100).label("total_price"),
+    Administrator.id.label("administrator_id"),
+    full_name(Administrator).label("administrator_name"),
+    Employee.id.label("employee_id"),
+    full_name(Employee).label("employee_name"),
+    CustomerCar.id.label("customer_car_id"),
+    CustomerCar.year.label("year"),
+    CustomerCar.number.label("number"),
+    Customer.id.label("customer_id"),
+    full_name(Customer).label("customer_name"),
+    Customer.email.label("customer_email"),
+    Car.model.label("model"),
+    Brand.name.label("brand"),
+)
+
+
+def join_order_relations(query: Select) -> Select:
+    return (
+        query.select_from(Order)
+        .join(CustomerCar, Order.customer_car_id == CustomerCar.id)
+        .join(Car, CustomerCar.car_id == Car.id)
+        .join(Brand, Car.brand_id == Brand.id)
+        .join(Customer, CustomerCar.user_id == Customer.id)
+        .join(Employee, Order.employee_id == Employee.id)
+        .join(Administrator, Order.administrator_id == Administrator.id)
+    )
+
+
+def select_order_rows(*extra_columns) -> Select:
+    return join_order_relations(select(*ORDER_ROW_COLUMNS, *extra_columns))
+
+
+def order_from_row(row) -> schemas.OrderBase:
+    return schemas.OrderBase(
+        id=row.id,
+        status=row.status.value,
+        start_date=row.start_date,
+        end_date=row.end_date,
+        totalTime=row.total_time,
+        totalPrice=row.total_price,
+        administrator=schemas.UserBase(id=row.administrator_id, full_name=row.administrator_name),
+        employee=schemas.UserBase(id=row.employee_id, full_name=row.employee_name),
+        customerCar=schemas.CustomerCarBase(
+            id=row.customer_car_id,
+            year=row.year,
+            number=row.number,
+            customer=schemas.CustomerBase(id=row.customer_id, full_name=row.customer_name, email=row.customer_email),
+            car=schemas.CarBase(model=row.model, brand=row.brand),
+        ),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Enum, Index, UniqueConstraint, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -12,13 +12,26 @@ class OrderStatus(enum.Enum):
 
 class OrderService(Base):
     __tablename__ = "order_service"
+    __table_args__ = (
+        UniqueConstraint("order_id", "service_id", name="uq_order_service_order_id_service_id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     order_id = Column(Integer, ForeignKey("orders.id"))
     service_id = Column(Integer, ForeignKey("services.id"))
+    price_kopecks = Column(Integer, nullable=True)  # Price at the moment of booking
+    time_seconds = Column(Integer, nullable=True)  # Duration at the moment of booking
 
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_start_date_id", "start_date", "id"),
+        Index(
+            "ix_orders_in_progress_end_date",
+            "end_date",
+            postgresql_where=text("status = 'in_progress'"),
+        ),
+    )
     id = Column(Integer, primary_key=True, index=True)
     status = Column(Enum(OrderStatus), nullable=False, default=OrderStatus.in_progress)
     start_date = Column(DateTime, default=datetime.utcnow)
@@ -26,6 +39,8 @@ class Order(Base):
     customer_car_id = Column(Integer, ForeignKey("customer_cars.id"), nullable=False)
     employee_id = Column(Integer, ForeignKey("user.id"), nullable=False)
     administrator_id = Column(Integer, ForeignKey("user.id"), nullable=False)
+    total_time_seconds = Column(Integer, nullable=False, default=0, server_default="0")
+    total_price_kopecks = Column(Integer, nullable=False, default=0, server_default="0")
 
     customer_car = relationship("CustomerCar", back_populates="orders")
     employee = relationship(
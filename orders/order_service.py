@@ -1,179 +1,204 @@
-from typing import List
-from sqlalchemy import func, select
+from typing import Optional
+from sqlalchemy import Row, exists, func, insert, literal, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
 from fastapi import HTTPException
 from datetime import datetime, timedelta
 from orders import models, schemas
 from service.models import Service
 from customer_cars.models import CustomerCar
-from cars.models import Car
 from auth.models import User
-from .schemas import OrderBase, UserBase, CustomerBase, CustomerCarBase, CarBase, OrderListResponse
-from .models import Order, OrderStatus
-from notifications.email_service import notify_customer
+from .schemas import OrderListResponse
+from .models import Order
+from .utils import encode_cursor, decode_cursor
+from .mapper import order_from_row, select_order_rows
+from .deadlines import DEADLINES_CHANNEL, deadline_queue, encode_deadline_changes
+from notifications.models import NotificationOutbox
+from notifications.outbox import wake_outbox_drainer
+from revisions.revision_service import bump_revisions, get_revisions
+from revisions.conditional import make_etag
+
+BULK_ORDER_LIMIT = 500
+
+# Таблицы, из которых собирается ответ /orders/today
+TODAY_ORDERS_TABLES = ("orders", "customer_cars", "cars", "brand", "user")
+
+ORDER_SORT_FIELDS = {
+    "id": models.Order.id,
+    "status": models.Order.status,
+    "start_date": models.Order.start_date,
+    "end_date": func.coalesce(models.Order.end_date, models.Order.start_date),
+    "totalTime": models.Order.total_time_seconds,
+    "totalPrice": models.Order.total_price_kopecks,
+}
+
+ORDER_CURSOR_DECODERS = {
+    "status": models.OrderStatus,
+    "start_date": datetime.fromisoformat,
+    "end_date": datetime.fromisoformat,
+}
 
 class OrderService:
     def __init__(self, session: AsyncSession):
         self.session = session
 
 
+    async def get_today_orders_etag(self) -> str:
+        revisions = await get_revisions(self.session, *TODAY_ORDERS_TABLES)
+        return make_etag("orders-today", revisions, datetime.utcnow().date().isoformat())
+
     async def get_today_orders(self) -> list[schemas.OrderBase]:
-        
-            start_of_day = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-            end_of_day = start_of_day + timedelta(days=1)
+        start_of_day = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        end_of_day = start_of_day + timedelta(days=1)
 
-            result = await self.session.execute(
-                select(Order)
-                .options(
-                    joinedload(models.Order.customer_car).joinedload(CustomerCar.user),
-                    joinedload(Order.customer_car).joinedload(CustomerCar.car).joinedload(Car.brand),
-                    joinedload(Order.employee),
-                    joinedload(Order.administrator),
-                )
-                .where(Order.start_date >= start_of_day, Order.start_date < end_of_day)
-            )
-            orders = result.scalars().all()
-            
-            order_list = []
-            for order in orders:
-                total_time = await self.calculate_total_time(order.id)
-                total_price = await self.calculate_total_price(order.id)
-
-                order_data = OrderBase(
-                    id=order.id,
-                    status=order.status.value,
-                    start_date=(order.start_date + timedelta(hours=7)).strftime('%Y-%m-%d %H:%M:%S'),
-                    end_date=(order.end_date + timedelta(hours=7)).strftime('%Y-%m-%d %H:%M:%S') if order.end_date else None,
-                    totalTime=total_time,
-                    totalPrice=total_price,
-                    administrator=UserBase(
-                        id=order.administrator.id,
-                        full_name=f"{order.administrator.first_name} {order.administrator.last_name} {order.administrator.patronymic}",
-                    ),
-                    employee=UserBase(
-                        id=order.employee.id,
-                        full_name=f"{order.employee.first_name} {order.employee.last_name} {order.employee.patronymic}",
-                    ),
-                    customerCar=CustomerCarBase(
-                        id=order.customer_car.id,
-                        year=order.customer_car.year,
-                        number=order.customer_car.number,
-                        customer=CustomerBase(
-                            id=order.customer_car.user.id,
-                            full_name=f"{order.customer_car.user.first_name} {order.customer_car.user.last_name} {order.customer_car.user.patronymic}",
-                            email=order.customer_car.user.email,
-                        ),
-                        car=CarBase(
-                            model=order.customer_car.car.model,
-                            brand=order.customer_car.car.brand.name,
-                        ),
-                    ),
-                )
-                order_list.append(order_data)
+        result = await self.session.execute(
+            select_order_rows().where(Order.start_date >= start_of_day, Order.start_date < end_of_day)
+        )
+        return [order_from_row(row) for row in result.all()]
 
-            return order_list
-    
     async def create_order(self, order_data: schemas.OrderCreate, administrator_id: int) -> dict:
-        new_order = models.Order(
-            status=models.OrderStatus.in_progress,
-            customer_car_id=order_data.customer_car_id,
-            employee_id=order_data.employee_id,
-            administrator_id=administrator_id,
-            start_date=datetime.utcnow(),
+        service_ids = list(dict.fromkeys(service.service_id for service in order_data.services))
+        services = await self._get_services(service_ids)
+        self._check_services_exist(service_ids, services)
+
+        total_time_seconds = sum(services[service_id].time_seconds for service_id in service_ids)
+        total_price_kopecks = sum(services[service_id].price_kopecks for service_id in service_ids)
+        start_date = datetime.utcnow()
+        end_date = start_date + timedelta(seconds=total_time_seconds)
+
+        result = await self.session.execute(
+            insert(models.Order)
+            .values(
+                status=models.OrderStatus.in_progress,
+                customer_car_id=order_data.customer_car_id,
+                employee_id=order_data.employee_id,
+                administrator_id=administrator_id,
+                start_date=start_date,
+                end_date=end_date,
+                total_time_seconds=total_time_seconds,
+                total_price_kopecks=total_price_kopecks,
+            )
+            .returning(models.Order.id)
         )
-        self.session.add(new_order)
-        await self.session.commit()
-        await self.session.refresh(new_order)
+        order_id = result.scalar_one()
 
-        for service in order_data.services:
-            order_service = models.OrderService(order_id=new_order.id, service_id=service.service_id)
-            self.session.add(order_service)
+        if service_ids:
+            await self.session.execute(
+                insert(models.OrderService), self._order_service_rows(order_id, service_ids, services)
+            )
 
+        await self._publish_deadlines([(order_id, end_date)])
+        await bump_revisions(self.session, "orders")
         await self.session.commit()
-        await self.session.refresh(new_order)
 
-        total_time = await self.calculate_total_time(new_order.id)
-        new_order.end_date = new_order.start_date + timedelta(minutes=total_time)
+        return {
+            "message": "Заказ создан",
+            "id": order_id,
+            "totalTime": total_time_seconds // 60,
+            "totalPrice": total_price_kopecks // 100,
+        }
+
+    async def create_orders_bulk(
+        self, orders_data: list[schemas.OrderCreate], administrator_id: int
+    ) -> schemas.OrderBulkResponse:
+        if len(orders_data) > BULK_ORDER_LIMIT:
+            raise HTTPException(
+                status_code=400, detail=f"За один запрос можно создать не более {BULK_ORDER_LIMIT} заказов"
+            )
 
-        await self.session.commit()
-        await self.session.refresh(new_order)
-
-        return {"message": "Заказ создан"}
-
-    async def calculate_total_time(self, order_id: int) -> int:
-        result = await self.session.execute(select(models.OrderService).where(models.OrderService.order_id == order_id))
-        order_services = result.scalars().all()
-        total_time = 0
-        for order_service in order_services:
-            service_result = await self.session.execute(select(Service).where(Service.id == order_service.service_id))
-            service = service_result.scalar_one_or_none()
-            if service:
-                total_time += service.time_seconds
-        return total_time // 60
-
-    async def calculate_total_price(self, order_id: int) -> int:
-        result = await self.session.execute(select(models.OrderService).where(models.OrderService.order_id == order_id))
-        order_services = result.scalars().all()
-        total_price = 0
-        for order_service in order_services:
-            service_result = await self.session.execute(select(Service).where(Service.id == order_service.service_id))
-            service = service_result.scalar_one_or_none()
-            if service:
-                total_price += service.price_kopecks
-        return total_price // 100
+        customer_car_ids = {order_data.customer_car_id for order_data in orders_data}
+        employee_ids = {order_data.employee_id for order_data in orders_data}
+        all_service_ids = {service.service_id for order_data in orders_data for service in order_data.services}
+
+        existing_customer_cars = set()
+        if customer_car_ids:
+            result = await self.session.execute(select(CustomerCar.id).where(CustomerCar.id.in_(customer_car_ids)))
+            existing_customer_cars = set(result.scalars().all())
+        existing_employees = set()
+        if employee_ids:
+            result = await self.session.execute(select(User.id).where(User.id.in_(employee_ids)))
+            existing_employees = set(result.scalars().all())
+        services = await self._get_services(list(all_service_ids))
+
+        results = [schemas.OrderBulkItemResult(index=index) for index in range(len(orders_data))]
+        valid_items = []
+        for index, order_data in enumerate(orders_data):
+            service_ids = list(dict.fromkeys(service.service_id for service in order_data.services))
+            if order_data.customer_car_id not in existing_customer_cars:
+                results[index].error = "Автомобиль клиента не найден"
+            elif order_data.employee_id not in existing_employees:
+                results[index].error = "Сотрудник не найден"
+            elif any(service_id not in services for service_id in service_ids):
+                missing = [str(service_id) for service_id in service_ids if service_id not in services]
+                results[index].error = f"Услуги не найдены: {', '.join(missing)}"
+            else:
+                valid_items.append((index, order_data, service_ids))
+
+        if valid_items:
+            start_date = datetime.utcnow()
+            order_rows = []
+            for _, order_data, service_ids in valid_items:
+                total_time_seconds = sum(services[service_id].time_seconds for service_id in service_ids)
+                order_rows.append({
+                    "status": models.OrderStatus.in_progress,
+                    "customer_car_id": order_data.customer_car_id,
+                    "employee_id": order_data.employee_id,
+                    "administrator_id": administrator_id,
+                    "start_date": start_date,
+                    "end_date": start_date + timedelta(seconds=total_time_seconds),
+                    "total_time_seconds": total_time_seconds,
+                    "total_price_kopecks": sum(services[service_id].price_kopecks for service_id in service_ids),
+                })
 
-    async def get_order_by_id_async(self, order_id: int) -> schemas.OrderBase:
-        result = await self.session.execute(
-            select(models.Order)
-            .options(
-                joinedload(models.Order.customer_car).joinedload(CustomerCar.user),
-                joinedload(models.Order.customer_car).joinedload(CustomerCar.car).joinedload(Car.brand),
-                joinedload(models.Order.employee),
-                joinedload(models.Order.administrator),
+            result = await self.session.execute(
+                insert(models.Order).returning(models.Order.id, sort_by_parameter_order=True), order_rows
             )
-            .where(models.Order.id == order_id)
-        )
-        order = result.unique().scalars().one_or_none()
-        
-        if not order:
-            raise HTTPException(status_code=404, detail="Заказ не найден")
+            order_ids = result.scalars().all()
+
+            order_service_rows = []
+            for order_id, (index, _, service_ids) in zip(order_ids, valid_items):
+                results[index].id = order_id
+                order_service_rows.extend(self._order_service_rows(order_id, service_ids, services))
+            if order_service_rows:
+                await self.session.execute(insert(models.OrderService), order_service_rows)
 
-        total_time = await self.calculate_total_time(order.id)
-        total_price = await self.calculate_total_price(order.id)
-
-        order_data = schemas.OrderBase(
-            id=order.id,
-            status=order.status.value,
-            start_date=(order.start_date + timedelta(hours=7)).strftime('%Y-%m-%d %H:%M:%S'),
-            end_date=(order.end_date + timedelta(hours=7)).strftime('%Y-%m-%d %H:%M:%S') if order.end_date else None,
-            totalTime=total_time,
-            totalPrice=total_price,
-            administrator=schemas.UserBase(
-                id=order.administrator.id,
-                full_name=f"{order.administrator.first_name} {order.administrator.last_name} {order.administrator.patronymic}",
-            ),
-            employee=schemas.UserBase(
-                id=order.employee.id,
-                full_name=f"{order.employee.first_name} {order.employee.last_name} {order.employee.patronymic}",
-            ),
-            customerCar=schemas.CustomerCarBase(
-                id=order.customer_car.id,
-                year=order.customer_car.year,
-                number=order.customer_car.number,
-                customer=schemas.CustomerBase(
-                    id=order.customer_car.user.id,
-                    full_name=f"{order.customer_car.user.first_name} {order.customer_car.user.last_name} {order.customer_car.user.patronymic}",
-                    email=order.customer_car.user.email,
-                ),
-                car=schemas.CarBase(
-                    model=order.customer_car.car.model,
-                    brand=order.customer_car.car.brand.name,
-                ),
-            ),
+            await self._publish_deadlines(
+                [(order_id, order_row["end_date"]) for order_id, order_row in zip(order_ids, order_rows)]
+            )
+            await bump_revisions(self.session, "orders")
+            await self.session.commit()
+
+        return schemas.OrderBulkResponse(
+            created=len(valid_items),
+            failed=len(orders_data) - len(valid_items),
+            results=results,
         )
 
-        return order_data
+    async def _publish_deadlines(self, changes: list[tuple[int, Optional[datetime]]]) -> None:
+        # NOTIFY уходит при коммите, его получает лидер планировщика в любом процессе
+        for payload in encode_deadline_changes(changes):
+            await self.session.execute(select(func.pg_notify(DEADLINES_CHANNEL, payload)))
+
+    @staticmethod
+    def _order_service_rows(order_id: int, service_ids: list[int], services: dict[int, Row]) -> list[dict]:
+        return [
+            {
+                "order_id": order_id,
+                "service_id": service_id,
+                "price_kopecks": services[service_id].price_kopecks,
+                "time_seconds": services[service_id].time_seconds,
+            }
+            for service_id in service_ids
+        ]
+
+    async def get_order_by_id_async(self, order_id: int) -> schemas.OrderBase:
+        result = await self.session.execute(select_order_rows().where(models.Order.id == order_id))
+        row = result.one_or_none()
+
+        if not row:
+            raise HTTPException(status_code=404, detail="Заказ не найден")
+
+        return order_from_row(row)
 
     async def get_orders(
             self, 
@@ -182,155 +207,249 @@ class OrderService:
             limit: int = 10, 
             status: int = None,
             sort_by: list[str] = None,
-            sort_order: str = "desc"
+            sort_order: str = "desc",
+            after: str = None,
         ) -> OrderListResponse:
-            query = select(models.Order).options(
-                joinedload(models.Order.customer_car).joinedload(CustomerCar.user),
-                joinedload(models.Order.customer_car).joinedload(CustomerCar.car).joinedload(Car.brand),
-                joinedload(models.Order.employee),
-                joinedload(models.Order.administrator),
-            )
+            sort_by = list(sort_by or [])
+            unknown_fields = [field for field in sort_by if field not in ORDER_SORT_FIELDS]
+            if unknown_fields:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Недопустимые поля сортировки: {', '.join(unknown_fields)}",
+                )
+            if sort_order not in ("asc", "desc"):
+                raise HTTPException(status_code=400, detail="sort_order должен быть 'asc' или 'desc'")
+            if "id" not in sort_by:
+                sort_by.append("id")
+            sort_columns = [ORDER_SORT_FIELDS[field] for field in sort_by]
 
+            filters = []
             if user.role_id == 2:
-                query = query.where(models.Order.employee_id == user.id)
+                filters.append(models.Order.employee_id == user.id)
             elif user.role_id == 3:
-                query = query.where(models.Order.customer_car.has(CustomerCar.user_id == user.id))
+                filters.append(models.Order.customer_car.has(CustomerCar.user_id == user.id))
 
             if status is not None:
-                query = query.where(models.Order.status == models.OrderStatus(status))
-
-            count_query = select(func.count()).select_from(query.subquery())
-
-            query = query.offset(skip).limit(limit)
-            
-            result = await self.session.execute(query)
-            orders = result.scalars().all()
+                try:
+                    filters.append(models.Order.status == models.OrderStatus(status))
+                except ValueError:
+                    raise HTTPException(status_code=400, detail="Некорректный статус заказа")
+
+            query = select_order_rows(*sort_columns).where(*filters)
+
+            count_query = select(func.count(models.Order.id)).where(*filters)
+
+            if after:
+                cursor_values = [
+                    literal(value, column.type)
+                    for value, column in zip(self._decode_order_cursor(after, sort_by, sort_order), sort_columns)
+                ]
+                if sort_order == "desc":
+                    query = query.where(tuple_(*sort_columns) < tuple_(*cursor_values))
+                else:
+                    query = query.where(tuple_(*sort_columns) > tuple_(*cursor_values))
+            else:
+                query = query.offset(skip)
+
+            if sort_order == "desc":
+                query = query.order_by(*(column.desc() for column in sort_columns))
+            else:
+                query = query.order_by(*(column.asc() for column in sort_columns))
+
+            # Лишняя строка показывает, есть ли следующая страница
+            result = await self.session.execute(query.limit(limit + 1))
+            rows = result.all()
             count_result = await self.session.execute(count_query)
             total_count = count_result.scalar()
-            order_list = []
-            for order in orders:
-                total_time = await self.calculate_total_time(order.id)
-                total_price = await self.calculate_total_price(order.id)
-                
-                order_data = schemas.OrderBase(
-                    id=order.id,
-                    status=order.status.value,
-                    start_date=(order.start_date + timedelta(hours=7)).strftime('%Y-%m-%d %H:%M:%S'),
-                    end_date=(order.end_date + timedelta(hours=7)).strftime('%Y-%m-%d %H:%M:%S') if order.end_date else None,
-                    totalTime=total_time,
-                    totalPrice=total_price,
-                    administrator=schemas.UserBase(
-                        id=order.administrator.id,
-                        full_name=f"{order.administrator.first_name} {order.administrator.last_name} {order.administrator.patronymic}",
-                    ),
-                    employee=schemas.UserBase(
-                        id=order.employee.id,
-                        full_name=f"{order.employee.first_name} {order.employee.last_name} {order.employee.patronymic}",
-                    ),
-                    customerCar=schemas.CustomerCarBase(
-                        id=order.customer_car.id,
-                        year=order.customer_car.year,
-                        number=order.customer_car.number,
-                        customer=schemas.CustomerBase(
-                            id=order.customer_car.user.id,
-                            full_name=f"{order.customer_car.user.first_name} {order.customer_car.user.last_name} {order.customer_car.user.patronymic}",
-                            email=order.customer_car.user.email,
-                        ),
-                        car=schemas.CarBase(
-                            model=order.customer_car.car.model,
-                            brand=order.customer_car.car.brand.name,
-                        ),
-                    ),
-                )
-                order_list.append(order_data)
 
-            if sort_by:
-                reverse = sort_order == "desc"
-                for field in reversed(sort_by):  
-                    order_list.sort(key=lambda x: getattr(x, field, None), reverse=reverse) #magic
-
-            return OrderListResponse(total_count=total_count, orders=order_list)
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = encode_cursor(sort_by, sort_order, list(rows[-1][-len(sort_columns):]))
+
+            order_list = [order_from_row(row) for row in rows]
+
+            return OrderListResponse(total_count=total_count, orders=order_list, next_cursor=next_cursor)
+
+    @staticmethod
+    def _decode_order_cursor(cursor: str, sort_by: list[str], sort_order: str) -> list:
+        try:
+            payload = decode_cursor(cursor)
+            if payload["sort"] != sort_by or payload["order"] != sort_order:
+                raise ValueError("Cursor does not match sorting")
+            if len(payload["values"]) != len(sort_by):
+                raise ValueError("Cursor does not match sorting")
+            return [
+                ORDER_CURSOR_DECODERS.get(field, int)(value)
+                for field, value in zip(sort_by, payload["values"])
+            ]
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Некорректный курсор")
 
     async def delete_order_by_id(self, order_id: int) -> dict:
         result = await self.session.execute(select(models.Order).where(models.Order.id == order_id))
         order = result.scalar_one_or_none()
         if order:
             await self.session.delete(order)
+            await self._publish_deadlines([(order_id, None)])
+            await bump_revisions(self.session, "orders")
             await self.session.commit()
             return {"message": "Заказ успешно удален"}
         raise HTTPException(status_code=404, detail="Заказ не найден")
 
     async def add_services_to_order(self, order_id: int, services: list[schemas.ServiceId]) -> dict:
-        result = await self.session.execute(select(models.Order).where(models.Order.id == order_id))
-        order = result.scalar_one_or_none()
-
-        if not order:
-            raise HTTPException(status_code=404, detail="Заказ не найден")
-
-        if order.status != models.OrderStatus.in_progress:
-            raise HTTPException(
-                status_code=400, detail="Нельзя добавлять услуги в уже выполненный заказ"
+        service_ids = list(dict.fromkeys(service.service_id for service in services))
+        if not service_ids:
+            raise HTTPException(status_code=400, detail="Не указаны услуги")
+
+        # Один запрос: вставка строк заказа и сдвиг end_date по тому, что реально вставилось.
+        # Уже добавленные услуги пропускает ON CONFLICT, тогда заказ не меняется и транзакция откатывается
+        requested = (
+            select(Service.id, Service.name, Service.price_kopecks, Service.time_seconds)
+            .where(Service.id.in_(service_ids))
+            .cte("requested")
+        )
+        order_in_progress = exists().where(
+            models.Order.id == order_id, models.Order.status == models.OrderStatus.in_progress
+        )
+        added = (
+            pg_insert(models.OrderService)
+            .from_select(
+                ["order_id", "service_id", "price_kopecks", "time_seconds"],
+                select(
+                    literal(order_id), requested.c.id, requested.c.price_kopecks, requested.c.time_seconds
+                ).where(order_in_progress),
             )
-
-        existing_services_result = await self.session.execute(
-            select(models.OrderService.service_id).where(
-                models.OrderService.order_id == order_id
+            .on_conflict_do_nothing(index_elements=["order_id", "service_id"])
+            .returning(
+                models.OrderService.service_id,
+                models.OrderService.price_kopecks,
+                models.OrderService.time_seconds,
+            )
+            .cte("added")
+        )
+        added_totals = select(
+            func.count().label("count"),
+            func.coalesce(func.sum(added.c.time_seconds), 0).label("time_seconds"),
+            func.coalesce(func.sum(added.c.price_kopecks), 0).label("price_kopecks"),
+        ).subquery("added_totals")
+        # Строка заказа блокируется до коммита, поэтому параллельные добавления не теряются
+        updated = (
+            update(models.Order)
+            .where(
+                models.Order.id == order_id,
+                models.Order.status == models.OrderStatus.in_progress,
+                added_totals.c.count == len(service_ids),
+            )
+            .values(
+                end_date=func.coalesce(models.Order.end_date, models.Order.start_date)
+                + added_totals.c.time_seconds * timedelta(seconds=1),
+                total_time_seconds=models.Order.total_time_seconds + added_totals.c.time_seconds,
+                total_price_kopecks=models.Order.total_price_kopecks + added_totals.c.price_kopecks,
             )
+            .returning(models.Order.end_date)
+            .cte("updated")
         )
-        existing_services = {row[0] for row in existing_services_result.all()}
+        result = await self.session.execute(
+            select(
+                requested.c.id,
+                requested.c.name,
+                added.c.service_id.is_not(None).label("added"),
+                select(updated.c.end_date).scalar_subquery().label("end_date"),
+            ).select_from(requested.outerjoin(added, added.c.service_id == requested.c.id))
+        )
+        rows = {row.id: row for row in result.all()}
+        end_date = next(iter(rows.values())).end_date if rows else None
 
-        additional_time_seconds = 0
-        for service in services:
-            if service.service_id in existing_services:
-                service_name = await self._get_service_name(service.service_id)
+        if end_date is None:
+            await self.session.rollback()
+            order_status = await self.session.scalar(
+                select(models.Order.status).where(models.Order.id == order_id)
+            )
+            if order_status is None:
+                raise HTTPException(status_code=404, detail="Заказ не найден")
+            if order_status != models.OrderStatus.in_progress:
                 raise HTTPException(
-                    status_code=400,
-                    detail=f"Данная услуга '{service_name}' уже присутствует в заказе",
+                    status_code=400, detail="Нельзя добавлять услуги в уже выполненный заказ"
                 )
-
-            new_order_service = models.OrderService(
-                order_id=order_id, service_id=service.service_id
-            )
-            self.session.add(new_order_service)
-
-            service_result = await self.session.execute(
-                select(Service).where(Service.id == service.service_id)
+            self._check_services_exist(service_ids, rows)
+            for service_id in service_ids:
+                if not rows[service_id].added:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Данная услуга '{rows[service_id].name}' уже присутствует в заказе",
+                    )
+            # Заказ завершился между вставкой и обновлением
+            raise HTTPException(
+                status_code=400, detail="Нельзя добавлять услуги в уже выполненный заказ"
             )
-            service_obj = service_result.scalar_one_or_none()
-            if service_obj:
-                additional_time_seconds += service_obj.time_seconds
 
-        order.end_date = order.end_date + timedelta(seconds=additional_time_seconds)
+        await self._publish_deadlines([(order_id, end_date)])
+        await bump_revisions(self.session, "orders")
         await self.session.commit()
-        await self.session.refresh(order)
 
         return {"message": "Заказ добавлен"}
 
-    async def _get_service_name(self, service_id: int) -> str:
+    async def _get_services(self, service_ids: list[int]) -> dict[int, Row]:
+        # Цены попадают в снимок заказа, поэтому читаются из БД в транзакции записи, а не из кэша:
+        # воркер мог ещё не получить NOTIFY об изменении прайса
+        if not service_ids:
+            return {}
         result = await self.session.execute(
-            select(Service).where(Service.id == service_id)
+            select(Service.id, Service.name, Service.price_kopecks, Service.time_seconds)
+            .where(Service.id.in_(service_ids))
         )
-        service = result.scalar_one_or_none()
-        return service.name if service else "Такой услуги нет"
+        return {row.id: row for row in result.all()}
 
-    async def update_order_statuses(self):
-        current_time = datetime.utcnow()
+    @staticmethod
+    def _check_services_exist(service_ids: list[int], services: dict[int, Row]) -> None:
+        missing = [str(service_id) for service_id in service_ids if service_id not in services]
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Услуги не найдены: {', '.join(missing)}")
+
+    async def update_order_statuses(self) -> int:
+        # Core-таблица: ORM-вариант UPDATE отбрасывает колонки других таблиц из RETURNING
         result = await self.session.execute(
-            select(models.Order)
-            .options(joinedload(models.Order.customer_car).joinedload(CustomerCar.user))
-            .where(models.Order.status == models.OrderStatus.in_progress)
+            update(models.Order.__table__)
+            .where(
+                models.Order.status == models.OrderStatus.in_progress,
+                models.Order.end_date < datetime.utcnow(),
+                models.Order.customer_car_id == CustomerCar.id,
+                CustomerCar.user_id == User.id,
+            )
+            .values(status=models.OrderStatus.completed)
+            .returning(models.Order.id, User.email, User.first_name, User.is_send_notify)
         )
-        orders = result.scalars().all()
+        completed_orders = result.all()
+
+        # Письма пишутся в outbox в той же транзакции, отправляет их отдельный разборщик
+        outbox_rows = [
+            {
+                "order_id": completed_order.id,
+                "email": completed_order.email,
+                "first_name": completed_order.first_name,
+            }
+            for completed_order in completed_orders
+            if completed_order.is_send_notify
+        ]
+        if outbox_rows:
+            await self.session.execute(insert(NotificationOutbox), outbox_rows)
+        if completed_orders:
+            await bump_revisions(self.session, "orders")
+        await self.session.commit()
 
-        for order in orders:
-            if order.end_date and current_time > order.end_date:
-                order.status = models.OrderStatus.completed
-                if order.customer_car.user.is_send_notify:
-                    await self.notify_and_update_order(order)
+        for completed_order in completed_orders:
+            deadline_queue.discard(completed_order.id)
+        if outbox_rows:
+            wake_outbox_drainer()
 
-        await self.session.commit()
+        return len(completed_orders)
 
-    async def notify_and_update_order(self, order):
-        await notify_customer(order.customer_car.user, order.id)
-        self.session.add(order)
-        await self.session.commit()
+    async def get_in_progress_deadlines(self) -> dict[int, datetime]:
+        result = await self.session.execute(
+            select(models.Order.id, models.Order.end_date).where(
+                models.Order.status == models.OrderStatus.in_progress,
+                models.Order.end_date.is_not(None),
+            )
+        )
+        return {order_id: end_date for order_id, end_date in result.all()}
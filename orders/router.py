@@ -1,22 +1,40 @@
+from datetime import datetime
 from typing import List
-from fastapi import APIRouter, Depends, status, Query
+from fastapi import APIRouter, Depends, Request, Response, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from . import schemas
 from .order_service import OrderService
-from database import get_async_session
+from .export import EXPORT_FORMATS, build_export_query, stream_orders_export
+from database import get_async_session, get_async_read_session, get_read_session_maker
 from auth.dependencies import require_admin, get_current_user, require_admin_or_employee_or_client
 from auth.models import User
 from auth.schemas import UserRead
+from revisions.conditional import conditional_response
+from pydantic import TypeAdapter
+from responses import json_response
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
+order_list_adapter = TypeAdapter(List[schemas.OrderBase])
+
 def get_order_service(session: AsyncSession = Depends(get_async_session)):
     return OrderService(session)
 
+def get_order_read_service(session: AsyncSession = Depends(get_async_read_session)):
+    return OrderService(session)
+
 @router.get("/today", response_model=List[schemas.OrderBase], dependencies=[Depends(require_admin_or_employee_or_client)])
-async def get_today_orders(order_service: OrderService = Depends(get_order_service)):
-    return await order_service.get_today_orders()
+async def get_today_orders(
+    request: Request,
+    response: Response,
+    order_service: OrderService = Depends(get_order_read_service),
+):
+    not_modified = conditional_response(request, response, await order_service.get_today_orders_etag())
+    if not_modified:
+        return not_modified
+    return json_response(await order_service.get_today_orders(), order_list_adapter, response)
 
 @router.get("/", response_model=schemas.OrderListResponse, dependencies=[Depends(require_admin_or_employee_or_client)])
 async def get_orders(
@@ -25,10 +43,14 @@ async def get_orders(
     status: int = None,
     sort_by: List[str] = Query(None),
     sort_order: str = Query("desc"),
-    order_service: OrderService = Depends(get_order_service),
+    after: str = Query(None),
+    order_service: OrderService = Depends(get_order_read_service),
     current_user: User = Depends(get_current_user)
 ):
-    return await order_service.get_orders(user=current_user, skip=skip, limit=limit, status=status, sort_by=sort_by, sort_order=sort_order)
+    orders = await order_service.get_orders(
+        user=current_user, skip=skip, limit=limit, status=status, sort_by=sort_by, sort_order=sort_order, after=after
+    )
+    return json_response(orders)
 
 @router.post("/", status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_admin)])
 async def create_order(
@@ -38,8 +60,31 @@ async def create_order(
 ):
     return await order_service.create_order(order, administrator_id=current_user.id)
 
+@router.post("/bulk", status_code=status.HTTP_201_CREATED, response_model=schemas.OrderBulkResponse, dependencies=[Depends(require_admin)])
+async def create_orders_bulk(
+    orders: List[schemas.OrderCreate],
+    order_service: OrderService = Depends(get_order_service),
+    current_user: User = Depends(get_current_user)
+):
+    return await order_service.create_orders_bulk(orders, administrator_id=current_user.id)
+
+@router.get("/export", dependencies=[Depends(require_admin)])
+async def export_orders(
+    request: Request,
+    date_from: datetime = None,
+    date_to: datetime = None,
+    status: int = None,
+    file_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+):
+    query = build_export_query(date_from=date_from, date_to=date_to, status=status)
+    return StreamingResponse(
+        stream_orders_export(query, file_format, get_read_session_maker(request)),
+        media_type=EXPORT_FORMATS[file_format],
+        headers={"Content-Disposition": f'attachment; filename="orders.{file_format}"'},
+    )
+
 @router.get("/{order_id}", response_model=schemas.OrderBase, dependencies=[Depends(require_admin)])
-async def get_order(order_id: int, order_service: OrderService = Depends(get_order_service)):
+async def get_order(order_id: int, order_service: OrderService = Depends(get_order_read_service)):
     return await order_service.get_order_by_id_async(order_id)
 
 @router.delete("/{order_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_admin)])
@@ -19,6 +19,18 @@ class OrderCreate(BaseModel):
     services: List[ServiceId]
 
 
+class OrderBulkItemResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class OrderBulkResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[OrderBulkItemResult]
+
+
 class ServiceBase(BaseModel):
     id: int
     name: str
@@ -128,6 +140,7 @@ class Order(BaseModel):
 class OrderListResponse(BaseModel):
     total_count: int
     orders: List[OrderBase]
+    next_cursor: Optional[str] = None
 
     class Config:
         orm_mode = True    
\ No newline at end of file
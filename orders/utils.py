@@ -0,0 +1,31 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from enum import Enum
+
+
+def encode_cursor(sort_by: list[str], sort_order: str, values: list) -> str:
+    payload = {
+        "sort": sort_by,
+        "order": sort_order,
+        "values": [
+            value.isoformat() if isinstance(value, datetime)
+            else value.value if isinstance(value, Enum)
+            else value
+            for value in values
+        ],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(payload, dict) or not {"sort", "order", "values"} <= payload.keys():
+        raise ValueError("Invalid cursor")
+    return payload
@@ -0,0 +1,24 @@
+from typing import Any, Optional
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+from config import FAST_JSON_RESPONSES
+
+
+def json_response(value: Any, adapter: Optional[TypeAdapter] = None, response: Optional[Response] = None) -> Any:
+    # Быстрый путь: одна сериализация в pydantic-core вместо повторной валидации по
+    # response_model, jsonable_encoder и json.dumps. response_model остаётся для OpenAPI
+    if not FAST_JSON_RESPONSES:
+        return value
+    if isinstance(value, BaseModel):
+        # Готовый DTO уже провалидирован при создании
+        body = value.model_dump_json()
+    else:
+        # ORM-объекты из кэша или запроса: одна валидация from_attributes и сразу JSON
+        body = adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+    result = Response(content=body, media_type="application/json")
+    if response is not None:
+        # raw, а не dict: повторяющиеся заголовки вроде Set-Cookie не схлопываются
+        result.raw_headers.extend(response.headers.raw)
+    return result
@@ -0,0 +1,31 @@
+from typing import Optional
+
+from fastapi import Request, Response
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(name: str, revisions: dict[str, int], *parts) -> str:
+    tags = [name]
+    tags.extend(f"{table}.{revisions[table]}" for table in sorted(revisions))
+    tags.extend(str(part) for part in parts)
+    return '"' + "-".join(tags) + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match сравнивается слабо: W/"x" совпадает с "x"
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def conditional_response(request: Request, response: Response, etag: str) -> Optional[Response]:
+    # Ревизия читается до данных, поэтому ETag никогда не опережает тело ответа
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,11 @@
+from sqlalchemy import BigInteger, Column, String
+
+from database import Base
+
+
+class TableRevision(Base):
+    # Счётчик изменений таблицы; из него строятся ETag для GET-запросов
+    __tablename__ = "table_revisions"
+
+    table_name = Column(String, primary_key=True)
+    revision = Column(BigInteger, nullable=False, default=0, server_default="0")
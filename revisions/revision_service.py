@@ -0,0 +1,26 @@
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from revisions.models import TableRevision
+
+
+async def bump_revisions(session: AsyncSession, *tables: str) -> None:
+    # Вызывается прямо перед коммитом: строка счётчика блокируется до конца транзакции.
+    # Таблицы сортируются, чтобы параллельные транзакции брали блокировки в одном порядке
+    for table in sorted(set(tables)):
+        statement = insert(TableRevision).values(table_name=table, revision=1)
+        statement = statement.on_conflict_do_update(
+            index_elements=[TableRevision.table_name],
+            set_={"revision": TableRevision.revision + 1},
+        )
+        await session.execute(statement)
+
+
+async def get_revisions(session: AsyncSession, *tables: str) -> dict[str, int]:
+    result = await session.execute(
+        select(TableRevision.table_name, TableRevision.revision).where(TableRevision.table_name.in_(tables))
+    )
+    revisions = {table: 0 for table in tables}
+    revisions.update({table_name: revision for table_name, revision in result.all()})
+    return revisions
@@ -1,17 +1,160 @@
+import asyncio
+import time
+from datetime import datetime
+
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
-from database import async_session_maker
+from sqlalchemy import text
+from config import ORDER_RECONCILE_MINUTES, OUTBOX_PURGE_MINUTES, SCHEDULER_LEADER_RETRY_SECONDS, SCHEDULER_LOCK_ID
+import all_models  # noqa: F401
+from database import async_session_maker, engine
 from orders.order_service import OrderService
+from orders.deadlines import DEADLINES_CHANNEL, deadline_queue
+from notifications.email_service import email_dispatcher
+from notifications.outbox import purge_outbox, start_outbox_drainer, stop_outbox_drainer
+from monitoring.metrics import observe_sweep, scheduler_is_leader
 
 
 scheduler = AsyncIOScheduler()
+completion_task: asyncio.Task | None = None
+leader_task: asyncio.Task | None = None
 
 
 async def update_order_statuses_task():
-    async with async_session_maker() as session:  
+    async with async_session_maker() as session:
+        order_service = OrderService(session)
+        started = time.perf_counter()
+        completed = await order_service.update_order_statuses()
+        observe_sweep(time.perf_counter() - started, completed)
+
+
+async def reconcile_deadlines_task():
+    # Страховка: добирает пропущенные заказы и сверяет кучу с БД
+    async with async_session_maker() as session:
         order_service = OrderService(session)
-        await order_service.update_order_statuses()
+        started = time.perf_counter()
+        completed = await order_service.update_order_statuses()
+        observe_sweep(time.perf_counter() - started, completed)
+        deadline_queue.begin_reload()
+        try:
+            deadlines = await order_service.get_in_progress_deadlines()
+        except BaseException:
+            deadline_queue.abort_reload()
+            raise
+        deadline_queue.merge_reload(deadlines)
+
+
+async def purge_outbox_task():
+    async with async_session_maker() as session:
+        purged = await purge_outbox(session)
+    if purged:
+        print(f"Purged {purged} old notification outbox rows")
+
+
+async def run_completion_loop():
+    while True:
+        next_deadline = deadline_queue.next_deadline()
+        timeout = None
+        if next_deadline is not None:
+            timeout = max((next_deadline - datetime.utcnow()).total_seconds(), 0)
+        await deadline_queue.wait(timeout)
+
+        if deadline_queue.pop_due(datetime.utcnow()):
+            try:
+                await update_order_statuses_task()
+            except Exception as e:
+                print(f"Failed to update order statuses: {e}")
+
+
+def on_deadlines_notification(connection, pid, channel, payload):
+    deadline_queue.apply_notification(payload)
+
+
+async def become_leader():
+    global completion_task
+    print("Scheduler leadership acquired")
+    scheduler_is_leader.set(1)
+    try:
+        await reconcile_deadlines_task()
+    except Exception as e:
+        print(f"Failed to reconcile order deadlines: {e}")
+    completion_task = asyncio.create_task(run_completion_loop())
+    scheduler.resume()
+
+
+def step_down():
+    global completion_task
+    print("Scheduler leadership released")
+    scheduler_is_leader.set(0)
+    scheduler.pause()
+    if completion_task is not None:
+        completion_task.cancel()
+        completion_task = None
+
+
+async def run_leader_election():
+    # Сессионная advisory-блокировка: умер процесс или соединение - блокировку забирает другой воркер
+    while True:
+        try:
+            async with engine.connect() as connection:
+                connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+                try:
+                    # Не-лидер держит одно соединение и повторяет попытку на нём
+                    while not await connection.scalar(
+                        text("SELECT pg_try_advisory_lock(:lock_id)"), {"lock_id": SCHEDULER_LOCK_ID}
+                    ):
+                        await asyncio.sleep(SCHEDULER_LEADER_RETRY_SECONDS)
+
+                    raw_connection = await connection.get_raw_connection()
+                    await raw_connection.driver_connection.add_listener(DEADLINES_CHANNEL, on_deadlines_notification)
+                    await become_leader()
+                    try:
+                        while True:
+                            await asyncio.sleep(SCHEDULER_LEADER_RETRY_SECONDS)
+                            await connection.execute(text("SELECT 1"))
+                    finally:
+                        step_down()
+                finally:
+                    # Соединение не возвращается в пул, иначе блокировка переживёт лидера
+                    await connection.invalidate()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Scheduler leader election failed: {e}")
+        await asyncio.sleep(SCHEDULER_LEADER_RETRY_SECONDS)
+
+
+async def start_scheduler():
+    global leader_task
+    scheduler.start(paused=True)
+    leader_task = asyncio.create_task(run_leader_election())
+
+
+async def shutdown_scheduler():
+    if leader_task is not None:
+        leader_task.cancel()
+        try:
+            await leader_task
+        except asyncio.CancelledError:
+            pass
+    scheduler.shutdown()
+
+
+async def run_standalone():
+    await email_dispatcher.start()
+    await start_outbox_drainer()
+    await start_scheduler()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await shutdown_scheduler()
+        await stop_outbox_drainer()
+        await email_dispatcher.stop()
+
 
-scheduler.add_job(update_order_statuses_task, IntervalTrigger(minutes=2))
+scheduler.add_job(reconcile_deadlines_task, IntervalTrigger(minutes=ORDER_RECONCILE_MINUTES))
+scheduler.add_job(purge_outbox_task, IntervalTrigger(minutes=OUTBOX_PURGE_MINUTES))
 
 
+if __name__ == "__main__":
+    asyncio.run(run_standalone())
@@ -1,10 +1,13 @@
 # ... (existing imports)
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from service.service import ServiceService
 from . import schemas
-from database import AsyncSession, get_async_session
+from database import AsyncSession, get_async_session, get_async_read_session
 from auth.dependencies import require_admin_or_employee_or_client, require_admin
 from fastapi import status
+from catalog.cache import catalog_revision
+from revisions.conditional import conditional_response, make_etag
+from responses import json_response
 
 router = APIRouter(prefix="/services", tags=["Services"])
 
@@ -16,6 +19,10 @@ def get_service_service(session: AsyncSession = Depends(get_async_session)):
     return ServiceService(session)
 
 
+def get_service_read_service(session: AsyncSession = Depends(get_async_read_session)):
+    return ServiceService(session)
+
+
 
 @router.post(
     "/",
@@ -33,13 +40,19 @@ async def create_service(
 
 @router.get("/", response_model=schemas.ServiceListResponse)
 async def get_services(
+    request: Request,
+    response: Response,
     skip: int = 0, 
     limit: int = 100,
-    session: AsyncSession = Depends(get_async_session)
+    session: AsyncSession = Depends(get_async_read_session)
 ):
+    etag = make_etag("services", {"services": await catalog_revision(session, "services")})
+    not_modified = conditional_response(request, response, etag)
+    if not_modified:
+        return not_modified
     service_service = ServiceService(session)
     result = await service_service.get_services(skip=skip, limit=limit)
-    return result
+    return json_response(result, response=response)
 
 
 
@@ -49,7 +62,7 @@ async def get_services(
     dependencies=[Depends(require_admin_or_employee_or_client)],
 )
 async def get_service_by_id(
-    service_id: int, service_service: ServiceService = Depends(get_service_service)
+    service_id: int, service_service: ServiceService = Depends(get_service_read_service)
 ):
     return await service_service.get_service_by_id(service_id)
 
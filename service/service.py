@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from . import models, schemas
 from service.utils import convert_price_to_kopecks, convert_time_to_seconds
+from catalog.cache import catalog_cache, publish_catalog_change
 
 
 class ServiceService:
@@ -15,13 +16,19 @@ class ServiceService:
     ) -> models.Service:
         db_service = models.Service(**service_data.dict())
         self.session.add(db_service)
+        await publish_catalog_change(self.session, "services")
         await self.session.commit()
+        catalog_cache.invalidate("services")
         await self.session.refresh(db_service)
         return db_service
 
     async def get_services(
         self, skip: int = 0, limit: int = 100
     ) -> schemas.ServiceListResponse:
+        services = await catalog_cache.services()
+        if services is not None:
+            return schemas.ServiceListResponse(total_count=len(services), services=services[skip:skip + limit])
+
         query = select(models.Service).offset(skip).limit(limit)
         count_query = select(func.count()).select_from(models.Service)
 
@@ -35,9 +42,13 @@ class ServiceService:
     
 
     async def get_service_by_id(self, service_id: int) -> models.Service:
-        query = select(models.Service).where(models.Service.id == service_id)
-        result = await self.session.execute(query)
-        service = result.scalars().first()
+        services_by_id = await catalog_cache.services_by_id()
+        if services_by_id is not None:
+            service = services_by_id.get(service_id)
+        else:
+            query = select(models.Service).where(models.Service.id == service_id)
+            result = await self.session.execute(query)
+            service = result.scalars().first()
         if not service:
             raise HTTPException(status_code=404, detail="Service not found")
         return service
@@ -60,7 +71,9 @@ class ServiceService:
             else:
                 setattr(db_service, key, value)
 
+        await publish_catalog_change(self.session, "services")
         await self.session.commit()
+        catalog_cache.invalidate("services")
         await self.session.refresh(db_service)
         return db_service
 
@@ -73,4 +86,6 @@ class ServiceService:
             raise HTTPException(status_code=404, detail="Service not found")
 
         await self.session.delete(service)
+        await publish_catalog_change(self.session, "services")
         await self.session.commit()
+        catalog_cache.invalidate("services")
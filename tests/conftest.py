@@ -0,0 +1,77 @@
+import os
+
+# config читает окружение при импорте, поэтому значения задаются до импорта приложения.
+# Тесты очищают таблицы: нужна отдельная база, имя которой оканчивается на _test
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_PORT", "5432")
+os.environ.setdefault("DB_NAME", "car_wash_test")
+os.environ.setdefault("DB_USER", "postgres")
+os.environ.setdefault("DB_PASS", "postgres")
+os.environ.setdefault("SECRET_AUTH", "test-secret")
+os.environ["SCHEDULER_ENABLED"] = "false"
+# Соединения asyncpg привязаны к event loop, а пул пережил бы loop теста
+os.environ["DB_USE_NULL_POOL"] = "true"
+# /metrics проверяется на настоящем приложении, а middleware подключается при импорте main
+os.environ["METRICS_ENABLED"] = "true"
+os.environ["METRICS_TOKEN"] = "test-metrics-token"
+
+import httpx
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+import all_models  # noqa: F401
+from auth.base_config import get_jwt_strategy
+from config import DB_NAME
+from database import Base, async_session_maker, engine
+from main import app
+from tests.seed import seed
+
+SEED_ORDERS = 60
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def database(anyio_backend):
+    if not DB_NAME.endswith("_test"):
+        pytest.skip(f"DB_NAME={DB_NAME}: тесты очищают таблицы, имя базы должно оканчиваться на _test")
+    try:
+        async with engine.begin() as connection:
+            await connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            await connection.run_sync(Base.metadata.create_all)
+    except (OSError, DBAPIError) as e:
+        pytest.skip(f"Тестовая база недоступна: {e}")
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture(scope="session")
+async def seeded(database):
+    async with async_session_maker() as session:
+        return await seed(session, orders=SEED_ORDERS)
+
+
+@pytest.fixture
+async def session(database):
+    async with async_session_maker() as session:
+        yield session
+
+
+@pytest.fixture
+async def client_as(seeded):
+    # Клиент приложения с cookie авторизации пользователя нужной роли
+    clients = []
+
+    async def login(role: str) -> httpx.AsyncClient:
+        token = await get_jwt_strategy().write_token(seeded.users[role])
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", cookies={"car-wash": token})
+        clients.append(client)
+        return client
+
+    yield login
+    for client in clients:
+        await client.aclose()
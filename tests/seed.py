@@ -0,0 +1,101 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth.models import Role, User
+from brand.models import Brand
+from cars.models import Car
+from customer_cars.models import CustomerCar
+from database import Base
+from orders.models import Order, OrderService, OrderStatus
+from service.models import Service
+
+ROLES = {1: "admin", 2: "employee", 3: "client"}
+
+
+@dataclass
+class SeedData:
+    users: dict[str, User] = field(default_factory=dict)
+    customer_car_id: int = 0
+    service_ids: list[int] = field(default_factory=list)
+    order_ids: list[int] = field(default_factory=list)
+
+
+async def clear_tables(session: AsyncSession) -> None:
+    tables = ", ".join(f'"{table.name}"' for table in Base.metadata.sorted_tables)
+    await session.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+
+
+async def seed(session: AsyncSession, orders: int, services_per_order: int = 2) -> SeedData:
+    # Общие данные для тестов и бенчмарков: по пользователю на роль, одна машина клиента
+    await clear_tables(session)
+    data = SeedData()
+    user_ids = {}
+
+    await session.execute(insert(Role), [{"id": role_id, "name": name} for role_id, name in ROLES.items()])
+    for role_id, name in ROLES.items():
+        user_ids[name] = await session.scalar(
+            insert(User)
+            .values(
+                email=f"{name}@example.com",
+                username=name,
+                first_name=name.capitalize(),
+                last_name="Test",
+                hashed_password="-",
+                role_id=role_id,
+            )
+            .returning(User.id)
+        )
+
+    brand_id = await session.scalar(insert(Brand).values(name="Toyota").returning(Brand.id))
+    car_id = await session.scalar(insert(Car).values(model="Camry", brand_id=brand_id).returning(Car.id))
+    data.customer_car_id = await session.scalar(
+        insert(CustomerCar)
+        .values(year=2020, number="А123ВС", car_id=car_id, user_id=user_ids["client"])
+        .returning(CustomerCar.id)
+    )
+
+    result = await session.execute(
+        insert(Service).returning(Service.id, sort_by_parameter_order=True),
+        [
+            {"name": f"Услуга {index}", "price_kopecks": 50000 + index * 100, "time_seconds": 600 + index * 60}
+            for index in range(max(services_per_order, 1))
+        ],
+    )
+    data.service_ids = list(result.scalars().all())
+
+    if orders:
+        now = datetime.utcnow()
+        # Заказы "сегодня" в середине суток UTC: тест не должен зависеть от часа запуска
+        noon = now.replace(hour=12, minute=0, second=0, microsecond=0)
+        result = await session.execute(
+            insert(Order).returning(Order.id, sort_by_parameter_order=True),
+            [
+                {
+                    "status": OrderStatus.completed if index % 3 == 0 else OrderStatus.in_progress,
+                    "customer_car_id": data.customer_car_id,
+                    "employee_id": user_ids["employee"],
+                    "administrator_id": user_ids["admin"],
+                    "start_date": noon - timedelta(seconds=index),
+                    "end_date": now + timedelta(hours=1),
+                    "total_time_seconds": 1200,
+                    "total_price_kopecks": 100000,
+                }
+                for index in range(orders)
+            ],
+        )
+        data.order_ids = list(result.scalars().all())
+        await session.execute(
+            insert(OrderService),
+            [
+                {"order_id": order_id, "service_id": service_id, "price_kopecks": 50000, "time_seconds": 600}
+                for order_id in data.order_ids
+                for service_id in data.service_ids[:services_per_order]
+            ],
+        )
+
+    await session.commit()
+    data.users = {name: await session.get(User, user_id) for name, user_id in user_ids.items()}
+    return data
@@ -0,0 +1,143 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import delete, insert, select
+
+from database import async_session_maker
+from monitoring.sql_stats import count_queries, install_sql_stats
+from orders.models import Order, OrderService as OrderServiceRow, OrderStatus
+from orders.order_service import OrderService
+from orders.schemas import ServiceId
+from service.models import Service
+
+pytestmark = pytest.mark.anyio
+
+START = datetime(2024, 1, 1, 9, 0)
+
+
+@pytest.fixture
+async def empty_order(seeded):
+    # Отдельный заказ без услуг и свои услуги, чтобы не менять общие данные
+    async with async_session_maker() as session:
+        order_id = await session.scalar(
+            insert(Order)
+            .values(
+                status=OrderStatus.in_progress,
+                customer_car_id=seeded.customer_car_id,
+                employee_id=seeded.users["employee"].id,
+                administrator_id=seeded.users["admin"].id,
+                start_date=START,
+                end_date=START,
+            )
+            .returning(Order.id)
+        )
+        result = await session.execute(
+            insert(Service).returning(Service.id, sort_by_parameter_order=True),
+            [
+                {"name": f"Доп. услуга {index}", "price_kopecks": 10000 * (index + 1), "time_seconds": 60 * (index + 1)}
+                for index in range(5)
+            ],
+        )
+        service_ids = list(result.scalars().all())
+        await session.commit()
+    yield order_id, service_ids
+    async with async_session_maker() as session:
+        await session.execute(delete(OrderServiceRow).where(OrderServiceRow.order_id == order_id))
+        await session.execute(delete(Order).where(Order.id == order_id))
+        await session.execute(delete(Service).where(Service.id.in_(service_ids)))
+        await session.commit()
+
+
+async def add(order_id: int, service_ids: list[int]) -> dict:
+    async with async_session_maker() as session:
+        return await OrderService(session).add_services_to_order(
+            order_id, [ServiceId(service_id=service_id) for service_id in service_ids]
+        )
+
+
+async def load(order_id: int) -> tuple[Order, dict[int, tuple[int, int]]]:
+    async with async_session_maker() as session:
+        order = await session.get(Order, order_id)
+        result = await session.execute(
+            select(OrderServiceRow.service_id, OrderServiceRow.price_kopecks, OrderServiceRow.time_seconds)
+            .where(OrderServiceRow.order_id == order_id)
+        )
+        return order, {service_id: (price, seconds) for service_id, price, seconds in result.all()}
+
+
+async def test_add_services_is_one_statement_before_commit(empty_order):
+    order_id, service_ids = empty_order
+    install_sql_stats()
+    # Запрос с CTE, NOTIFY о сроке и счётчик ревизий; коммит драйвер не считает
+    with count_queries(3):
+        await add(order_id, service_ids[:2])
+
+    order, rows = await load(order_id)
+    assert rows == {service_ids[0]: (10000, 60), service_ids[1]: (20000, 120)}
+    assert order.total_price_kopecks == 30000
+    assert order.total_time_seconds == 180
+    assert order.end_date == START + timedelta(seconds=180)
+
+
+async def test_add_services_rejects_duplicates_without_changes(empty_order):
+    order_id, service_ids = empty_order
+    await add(order_id, service_ids[:1])
+
+    with pytest.raises(HTTPException) as error:
+        await add(order_id, [service_ids[1], service_ids[0]])
+    assert error.value.status_code == 400
+    assert "Доп. услуга 0" in error.value.detail
+
+    order, rows = await load(order_id)
+    assert set(rows) == {service_ids[0]}
+    assert order.total_time_seconds == 60
+    assert order.end_date == START + timedelta(seconds=60)
+
+
+async def test_add_services_checks_order_before_services(empty_order):
+    _, service_ids = empty_order
+    with pytest.raises(HTTPException) as error:
+        await add(10**9, [service_ids[0], 10**9])
+    assert error.value.status_code == 404
+
+    with pytest.raises(HTTPException) as error:
+        await add(empty_order[0], [service_ids[0], 10**9])
+    assert error.value.status_code == 400
+    assert str(10**9) in error.value.detail
+
+
+async def test_add_services_rejects_completed_order(empty_order):
+    order_id, service_ids = empty_order
+    async with async_session_maker() as session:
+        order = await session.get(Order, order_id)
+        order.status = OrderStatus.completed
+        await session.commit()
+
+    with pytest.raises(HTTPException) as error:
+        await add(order_id, service_ids[:1])
+    assert error.value.status_code == 400
+    assert (await load(order_id))[1] == {}
+
+
+async def test_concurrent_adds_are_not_lost(empty_order):
+    order_id, service_ids = empty_order
+    await asyncio.gather(*(add(order_id, [service_id]) for service_id in service_ids))
+
+    order, rows = await load(order_id)
+    assert set(rows) == set(service_ids)
+    assert order.total_time_seconds == 60 * (1 + 2 + 3 + 4 + 5)
+    assert order.total_price_kopecks == 10000 * (1 + 2 + 3 + 4 + 5)
+    assert order.end_date == START + timedelta(seconds=order.total_time_seconds)
+
+
+async def test_concurrent_duplicate_add_succeeds_once(empty_order):
+    order_id, service_ids = empty_order
+    results = await asyncio.gather(*(add(order_id, service_ids[:1]) for _ in range(4)), return_exceptions=True)
+
+    assert sum(1 for result in results if isinstance(result, dict)) == 1
+    assert all(result.status_code == 400 for result in results if isinstance(result, HTTPException))
+    order, rows = await load(order_id)
+    assert set(rows) == {service_ids[0]}
+    assert order.total_time_seconds == 60
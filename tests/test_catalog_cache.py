@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+from sqlalchemy import delete, insert
+
+from catalog.cache import CatalogCache, catalog_cache, publish_catalog_change, run_catalog_listener
+from database import async_session_maker
+from service.models import Service
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def extra_services(seeded):
+    service_ids = []
+
+    async def add(name: str) -> int:
+        async with async_session_maker() as session:
+            service_id = await session.scalar(
+                insert(Service).values(name=name, price_kopecks=1000, time_seconds=60).returning(Service.id)
+            )
+            await session.commit()
+        service_ids.append(service_id)
+        return service_id
+
+    yield add
+    async with async_session_maker() as session:
+        await session.execute(delete(Service).where(Service.id.in_(service_ids)))
+        await session.commit()
+
+
+async def service_names(cache: CatalogCache) -> set[str]:
+    return {service.name for service in await cache.services()}
+
+
+async def test_revision_checks_are_not_counted_as_hits(seeded):
+    cache = CatalogCache()
+    for _ in range(3):
+        assert await cache.revision("services") is not None
+    assert (cache.hits, cache.misses) == (0, 0)
+
+    await cache.services()
+    await cache.services()
+    await cache.services_by_id()
+    assert (cache.hits, cache.misses) == (3, 0)
+
+
+async def test_data_lookups_count_misses_and_hits(seeded):
+    cache = CatalogCache()
+    await cache.services()
+    await cache.services()
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+async def test_invalidate_reloads_the_table(extra_services):
+    cache = CatalogCache()
+    before = await service_names(cache)
+
+    await extra_services("Химчистка")
+    # Без инвалидации кэш отдаёт прежние данные
+    assert await service_names(cache) == before
+    cache.invalidate("services")
+    assert await service_names(cache) == before | {"Химчистка"}
+
+
+def test_brand_change_marks_cars_stale():
+    cache = CatalogCache()
+    cache._stale.clear()
+    cache.invalidate("brand")
+    assert cache._stale == {"brand", "cars"}
+
+
+async def test_invalidation_during_load_keeps_the_table_stale(extra_services, monkeypatch):
+    cache = CatalogCache()
+    load = cache._load
+    changes = []
+
+    async def load_with_concurrent_change(session, table):
+        await load(session, table)
+        if not changes:
+            # Пока читали таблицу, другой воркер добавил услугу и прислал NOTIFY
+            changes.append(await extra_services("Антидождь"))
+            cache.invalidate(table)
+
+    monkeypatch.setattr(cache, "_load", load_with_concurrent_change)
+    assert "Антидождь" not in await service_names(cache)
+    assert "services" in cache._stale
+    assert "Антидождь" in await service_names(cache)
+    assert "services" not in cache._stale
+    assert cache.misses == 2
+
+
+async def test_notify_from_another_worker_invalidates(seeded):
+    task = asyncio.create_task(run_catalog_listener())
+    try:
+        # NOTIFY до LISTEN теряется: пока слушатель подключается, повторяем изменение
+        for _ in range(50):
+            await catalog_cache.services()
+            async with async_session_maker() as session:
+                await publish_catalog_change(session, "services")
+                await session.commit()
+            await asyncio.sleep(0.1)
+            if "services" in catalog_cache._stale:
+                break
+        assert "services" in catalog_cache._stale
+    finally:
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
@@ -0,0 +1,88 @@
+import pytest
+from sqlalchemy import delete, select
+
+from brand.models import Brand
+from cars.models import Car
+from catalog.cache import catalog_cache
+from catalog.importer import CatalogImporter, parse_rows
+from database import async_session_maker
+
+pytestmark = pytest.mark.anyio
+
+IMPORTED_BRANDS = ("Lada", "Kia")
+IMPORTED_MODELS = ("Vesta", "Granta", "Rio")
+
+CSV = "\n".join(
+    [
+        "brand,model",
+        "LADA,Vesta",
+        "lada, Granta",
+        "Kia,Rio",
+        "Lada,Vesta",  # повтор в файле
+        "Toyota,Camry",  # уже есть в справочнике
+        "Toyota1,Corolla",
+        "Kia,",
+        "Kia,Ceed,2020",
+        "",
+    ]
+)
+
+
+@pytest.fixture
+async def imported_catalog(seeded):
+    yield
+    async with async_session_maker() as session:
+        await session.execute(delete(Car).where(Car.model.in_(IMPORTED_MODELS)))
+        await session.execute(delete(Brand).where(Brand.name.in_(IMPORTED_BRANDS)))
+        await session.commit()
+    catalog_cache.invalidate("brand")
+
+
+async def test_csv_import_reports_duplicates_and_invalid_rows(client_as, imported_catalog):
+    admin = await client_as("admin")
+    response = await admin.post("/catalog/import?format=csv", content=CSV.encode())
+    assert response.status_code == 200
+    report = response.json()
+
+    assert {key: report[key] for key in ("total", "inserted_brands", "inserted", "skipped", "invalid")} == {
+        "total": 8,
+        "inserted_brands": 2,
+        "inserted": 3,
+        "skipped": 2,
+        "invalid": 3,
+    }
+    assert report["errors"] == [
+        {"line": 7, "error": "Название бренда может содержать только буквы"},
+        {"line": 8, "error": "Пустая модель"},
+        {"line": 9, "error": "Неверное число колонок"},
+    ]
+
+    async with async_session_maker() as session:
+        rows = (
+            await session.execute(
+                select(Car.model, Brand.name).join(Brand, Car.brand_id == Brand.id).where(Car.model.in_(IMPORTED_MODELS))
+            )
+        ).all()
+    assert sorted(rows) == [("Granta", "Lada"), ("Rio", "Kia"), ("Vesta", "Lada")]
+
+    # Повторный импорт ничего не добавляет
+    again = (await admin.post("/catalog/import?format=csv", content=CSV.encode())).json()
+    assert (again["inserted_brands"], again["inserted"], again["skipped"]) == (0, 0, 5)
+
+
+async def test_import_skips_duplicates_across_batches(imported_catalog):
+    async def lines():
+        for line in ['{"brand": "Kia", "model": "Rio"}', "не json", '{"brand": "Kia", "model": "Rio"}', "[1]"]:
+            yield line
+
+    async with async_session_maker() as session:
+        report = await CatalogImporter(session, batch_size=1).import_rows(parse_rows(lines(), "jsonl"))
+
+    assert (report.total, report.inserted_brands, report.inserted, report.skipped, report.invalid) == (4, 1, 1, 1, 2)
+    assert [error.line for error in report.errors] == [2, 4]
+
+
+async def test_import_requires_admin(client_as):
+    employee = await client_as("employee")
+    response = await employee.post("/catalog/import?format=csv", content=CSV.encode())
+    assert response.status_code == 403
@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta
+
+from orders.deadlines import DeadlineQueue
+
+NOW = datetime(2024, 1, 1, 12, 0)
+
+
+def test_reload_keeps_changes_made_while_loading():
+    queue = DeadlineQueue()
+    queue.push(1, NOW)
+    queue.push(2, NOW + timedelta(hours=1))
+
+    queue.begin_reload()
+    # Пришли по NOTIFY, пока читался снимок
+    queue.push(3, NOW + timedelta(hours=2))
+    queue.discard(2)
+    queue.merge_reload({1: NOW + timedelta(minutes=5), 2: NOW + timedelta(hours=1), 4: NOW})
+
+    assert queue.pop_due(NOW + timedelta(days=1)) == [4, 1, 3]
+
+
+def test_reload_drops_orders_missing_from_snapshot():
+    queue = DeadlineQueue()
+    queue.push(1, NOW)
+    queue.push(2, NOW)
+
+    queue.begin_reload()
+    queue.merge_reload({2: NOW})
+
+    assert len(queue) == 1
+    assert queue.pop_due(NOW) == [2]
@@ -0,0 +1,103 @@
+import smtplib
+import socket
+
+import pytest
+
+from notifications import email_service
+from notifications.email_service import EmailDispatcher, build_order_completed_message
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+
+pytestmark = pytest.mark.anyio
+
+
+class RecordingHandler:
+    def __init__(self, temporary_failures: int = 0):
+        self.temporary_failures = temporary_failures
+        self.messages = []
+        self.peers = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.temporary_failures:
+            self.temporary_failures -= 1
+            return "451 Try again later"
+        self.messages.append(envelope.rcpt_tos)
+        self.peers.add(session.peer)
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    def start(handler: RecordingHandler):
+        controller = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=free_port())
+        controller.start()
+        servers.append(controller)
+        monkeypatch.setattr(email_service, "SMTP_HOST", controller.hostname)
+        monkeypatch.setattr(email_service, "SMTP_PORT", controller.port)
+        monkeypatch.setattr(email_service, "SMTP_STARTTLS", False)
+        monkeypatch.setattr(email_service, "SMTP_PASS", None)
+        return handler
+
+    servers = []
+    yield start
+    for controller in servers:
+        controller.stop()
+
+
+async def test_dispatcher_reuses_pooled_connections(smtp_server):
+    handler = smtp_server(RecordingHandler())
+    dispatcher = EmailDispatcher(pool_size=2, queue_size=10, max_retries=0, backoff_seconds=0)
+    try:
+        for order_id in range(6):
+            await dispatcher.send(build_order_completed_message(f"client{order_id}@example.com", "Клиент", order_id))
+    finally:
+        await dispatcher.stop()
+
+    assert len(handler.messages) == 6
+    # Одно соединение на воркер, а не на каждое письмо
+    assert len(handler.peers) <= 2
+
+
+async def test_dispatcher_retries_temporary_errors(smtp_server):
+    handler = smtp_server(RecordingHandler(temporary_failures=1))
+    dispatcher = EmailDispatcher(pool_size=1, queue_size=10, max_retries=2, backoff_seconds=0)
+    try:
+        await dispatcher.send(build_order_completed_message("client@example.com", "Клиент", 1))
+    finally:
+        await dispatcher.stop()
+
+    assert len(handler.messages) == 1
+
+
+async def test_dispatcher_send_without_retry_fails_fast(smtp_server):
+    handler = smtp_server(RecordingHandler(temporary_failures=1))
+    dispatcher = EmailDispatcher(pool_size=1, queue_size=10, max_retries=2, backoff_seconds=0)
+    try:
+        with pytest.raises(smtplib.SMTPResponseException) as error:
+            await dispatcher.send(build_order_completed_message("client@example.com", "Клиент", 1), retry=False)
+    finally:
+        await dispatcher.stop()
+
+    assert error.value.smtp_code == 451
+    assert handler.messages == []
+
+
+@pytest.mark.parametrize(
+    ("error", "temporary"),
+    [
+        (smtplib.SMTPServerDisconnected(), True),
+        (ConnectionRefusedError(), True),
+        (smtplib.SMTPResponseException(451, "Try again later"), True),
+        (smtplib.SMTPResponseException(550, "No such user"), False),
+        (smtplib.SMTPAuthenticationError(535, "Bad credentials"), False),
+        (smtplib.SMTPRecipientsRefused({}), False),
+    ],
+)
+def test_is_temporary_smtp_error(error, temporary):
+    assert email_service.is_temporary_smtp_error(error) is temporary
@@ -0,0 +1,78 @@
+import pytest
+from sqlalchemy import delete, insert, select
+
+from catalog.cache import catalog_cache
+from database import async_session_maker
+from orders.models import Order, OrderService as OrderServiceRow
+from orders.order_service import OrderService
+from orders.schemas import OrderCreate, ServiceId
+from service.models import Service
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def own_service(seeded):
+    # Своя услуга: её меняем и на неё записываем заказы, не трогая общие данные
+    async with async_session_maker() as session:
+        service_id = await session.scalar(
+            insert(Service).values(name="Химчистка", price_kopecks=300000, time_seconds=3600).returning(Service.id)
+        )
+        await session.commit()
+    catalog_cache.invalidate("services")
+    yield service_id
+    async with async_session_maker() as session:
+        order_ids = (
+            await session.scalars(select(OrderServiceRow.order_id).where(OrderServiceRow.service_id == service_id))
+        ).all()
+        await session.execute(delete(OrderServiceRow).where(OrderServiceRow.order_id.in_(order_ids)))
+        await session.execute(delete(Order).where(Order.id.in_(order_ids)))
+        await session.execute(delete(Service).where(Service.id == service_id))
+        await session.commit()
+    catalog_cache.invalidate("services")
+
+
+async def test_services_not_modified_until_catalog_changes(client_as, own_service):
+    client = await client_as("client")
+    first = await client.get("/services/")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    cached = await client.get("/services/", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+    assert (await client.get("/services/", headers={"If-None-Match": f"W/{etag}"})).status_code == 304
+
+    admin = await client_as("admin")
+    updated = await admin.put(f"/services/{own_service}", json={"name": "Химчистка", "price": 3500, "time": 60})
+    assert updated.status_code == 200
+
+    changed = await client.get("/services/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    prices = {service["id"]: service["price"]["max_value"] for service in changed.json()["services"]}
+    assert prices[own_service] == 3500
+
+
+async def test_today_orders_etag_changes_after_booking(seeded, client_as, own_service):
+    client = await client_as("employee")
+    first = await client.get("/orders/today")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert (await client.get("/orders/today", headers={"If-None-Match": etag})).status_code == 304
+
+    async with async_session_maker() as session:
+        created = await OrderService(session).create_order(
+            OrderCreate(
+                customer_car_id=seeded.customer_car_id,
+                employee_id=seeded.users["employee"].id,
+                services=[ServiceId(service_id=own_service)],
+            ),
+            administrator_id=seeded.users["admin"].id,
+        )
+
+    changed = await client.get("/orders/today", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert created["id"] in {order["id"] for order in changed.json()}
@@ -0,0 +1,39 @@
+import pytest
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+import responses
+from responses import json_response
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+
+
+@pytest.fixture(autouse=True)
+def fast_json_responses(monkeypatch):
+    monkeypatch.setattr(responses, "FAST_JSON_RESPONSES", True)
+
+
+def test_json_response_keeps_repeated_headers():
+    response = Response()
+    del response.headers["content-length"]
+    response.set_cookie("first", "1")
+    response.set_cookie("second", "2")
+    response.headers["ETag"] = '"abc"'
+
+    result = json_response(Item(id=1, name="Мойка"), response=response)
+
+    cookies = [value for key, value in result.raw_headers if key == b"set-cookie"]
+    assert len(cookies) == 2
+    assert cookies[0].startswith(b"first=1") and cookies[1].startswith(b"second=2")
+    assert result.headers["etag"] == '"abc"'
+    assert result.headers["content-type"] == "application/json"
+    assert result.body == Item(id=1, name="Мойка").model_dump_json().encode()
+
+
+def test_json_response_serializes_with_adapter():
+    result = json_response([{"id": 1, "name": "Мойка"}], TypeAdapter(list[Item]))
+    assert result.body == '[{"id":1,"name":"Мойка"}]'.encode()
+    assert int(result.headers["content-length"]) == len(result.body)
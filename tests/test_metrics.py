@@ -0,0 +1,114 @@
+import re
+
+import pytest
+
+from config import METRICS_TOKEN
+from monitoring.metrics import Counter, registry
+
+pytestmark = pytest.mark.anyio
+
+# Грамматика текстового формата Prometheus 0.0.4 для строк с сэмплами
+SAMPLE = re.compile(r"^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)$")
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\\n]|\\[\\"n])*)"(,|$)')
+UNESCAPE = re.compile(r"\\([\\\"n])")
+VALUE = re.compile(r"^(?:[+-]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?|[+-]Inf|NaN)$")
+
+
+def parse_labels(text: str) -> dict[str, str]:
+    labels = {}
+    position = 0
+    while position < len(text):
+        match = LABEL.match(text, position)
+        assert match, f"Некорректные метки: {text!r}"
+        labels[match.group(1)] = UNESCAPE.sub(lambda escape: "\n" if escape.group(1) == "n" else escape.group(1), match.group(2))
+        position = match.end()
+    return labels
+
+
+def parse_exposition(body: str) -> tuple[dict[str, str], list[tuple[str, dict[str, str], float]]]:
+    types = {}
+    samples = []
+    for line in body.splitlines():
+        if not line:
+            continue
+        if line.startswith("# TYPE "):
+            _, _, name, type_name = line.split(" ", 3)
+            types[name] = type_name
+            continue
+        if line.startswith("# HELP "):
+            continue
+        match = SAMPLE.match(line)
+        assert match, f"Некорректная строка: {line!r}"
+        name, labels, value = match.groups()
+        assert VALUE.match(value), f"Некорректное значение: {line!r}"
+        samples.append((name, parse_labels(labels or ""), float(value)))
+    return types, samples
+
+
+@pytest.fixture
+def escaped_metric():
+    # Значение метки со всеми символами, которые формат требует экранировать
+    metric = registry.register(Counter("test_label_escaping_total", "Label escaping check", ("value",)))
+    metric.inc('quote " backslash \\ newline \n end')
+    yield metric
+    registry._metrics.remove(metric)
+
+
+async def scrape(client) -> str:
+    response = await client.get("/metrics", headers={"Authorization": f"Bearer {METRICS_TOKEN}"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    return response.text
+
+
+async def test_metrics_require_token(client_as):
+    client = await client_as("admin")
+    assert (await client.get("/metrics")).status_code == 401
+    assert (await client.get("/metrics", headers={"Authorization": "Bearer wrong"})).status_code == 401
+
+
+async def test_metrics_scrape_parses(seeded, client_as, escaped_metric):
+    client = await client_as("admin")
+    for _ in range(3):
+        assert (await client.get("/services/")).status_code == 200
+    assert (await client.get(f"/orders/{seeded.order_ids[0]}")).status_code == 200
+    assert (await client.get("/orders/999999999")).status_code == 404
+
+    types, samples = parse_exposition(await scrape(client))
+
+    # Шаблон пути, а не сам путь
+    requests = {
+        (labels["route"], labels["status"]): value
+        for name, labels, value in samples
+        if name == "http_requests_total" and labels["method"] == "GET"
+    }
+    assert requests[("/services/", "200")] >= 3
+    assert requests[("/orders/{order_id}", "200")] >= 1
+    assert requests[("/orders/{order_id}", "404")] >= 1
+
+    assert [labels["value"] for name, labels, _ in samples if name == "test_label_escaping_total"] == [
+        'quote " backslash \\ newline \n end'
+    ]
+
+    histograms = [name for name, type_name in types.items() if type_name == "histogram"]
+    assert "http_request_duration_seconds" in histograms
+    checked = 0
+    for histogram in histograms:
+        series = {}
+        for name, labels, value in samples:
+            if name in (f"{histogram}_bucket", f"{histogram}_sum", f"{histogram}_count"):
+                key = tuple(sorted((label, label_value) for label, label_value in labels.items() if label != "le"))
+                series.setdefault(key, {"buckets": []})
+                if name.endswith("_bucket"):
+                    series[key]["buckets"].append((float(labels["le"]), value))
+                else:
+                    series[key][name.rsplit("_", 1)[1]] = value
+        for key, data in series.items():
+            bounds = [bound for bound, _ in data["buckets"]]
+            counts = [count for _, count in data["buckets"]]
+            assert bounds == sorted(bounds) and bounds[-1] == float("inf"), (histogram, key)
+            assert counts == sorted(counts), f"{histogram}{key}: бакеты не накопительные"
+            assert "sum" in data and "count" in data, (histogram, key)
+            assert counts[-1] == data["count"], (histogram, key)
+            checked += 1
+    assert checked
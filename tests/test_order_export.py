@@ -0,0 +1,69 @@
+import csv
+import io
+import json
+
+import pytest
+
+from orders.order_service import OrderService
+from tests.conftest import SEED_ORDERS
+
+pytestmark = pytest.mark.anyio
+
+
+def expected_row(order) -> dict:
+    # Экспорт отдаёт копейки и секунды, OrderBase - рубли и минуты
+    return {
+        "id": order.id,
+        "status": order.status,
+        "start_date": order.start_date,
+        "end_date": order.end_date,
+        "total_time_seconds": order.totalTime * 60,
+        "total_price_kopecks": order.totalPrice * 100,
+        "car_number": order.customerCar.number,
+        "brand": order.customerCar.car.brand,
+        "model": order.customerCar.car.model,
+        "customer_id": order.customerCar.customer.id,
+        "customer": order.customerCar.customer.full_name,
+        "customer_email": order.customerCar.customer.email,
+        "employee": order.employee.full_name,
+        "administrator": order.administrator.full_name,
+    }
+
+
+async def expected_rows(seeded, session, status=None) -> list[dict]:
+    result = await OrderService(session).get_orders(user=seeded.users["admin"], limit=SEED_ORDERS, status=status)
+    # Экспорт упорядочен по start_date, id
+    return sorted((expected_row(order) for order in result.orders), key=lambda row: (row["start_date"], row["id"]))
+
+
+async def test_ndjson_export_matches_get_orders(seeded, session, client_as):
+    admin = await client_as("admin")
+    response = await admin.get("/orders/export", params={"format": "ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == SEED_ORDERS
+    assert rows == await expected_rows(seeded, session)
+
+
+async def test_csv_export_matches_get_orders(seeded, session, client_as):
+    admin = await client_as("admin")
+    response = await admin.get("/orders/export", params={"format": "csv", "status": 2})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    expected = [
+        {key: "" if value is None else str(value) for key, value in row.items()}
+        for row in await expected_rows(seeded, session, status=2)
+    ]
+    assert len(rows) == SEED_ORDERS // 3
+    assert rows == expected
+
+
+async def test_export_rejects_unknown_status_and_non_admins(client_as):
+    admin = await client_as("admin")
+    assert (await admin.get("/orders/export", params={"status": 7})).status_code == 400
+    employee = await client_as("employee")
+    assert (await employee.get("/orders/export")).status_code == 403
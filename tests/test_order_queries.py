@@ -0,0 +1,56 @@
+import pytest
+from fastapi import HTTPException
+
+from monitoring.sql_stats import count_queries, install_sql_stats
+from orders.order_service import OrderService
+from tests.conftest import SEED_ORDERS
+
+pytestmark = pytest.mark.anyio
+
+PAGE_SIZES = (1, 10, SEED_ORDERS)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def sql_stats():
+    install_sql_stats()
+
+
+@pytest.mark.parametrize("role", ["admin", "employee", "client"])
+async def test_get_orders_query_count_does_not_grow_with_page_size(seeded, session, role):
+    counts = []
+    for limit in PAGE_SIZES:
+        with count_queries() as stats:
+            result = await OrderService(session).get_orders(user=seeded.users[role], limit=limit)
+        assert len(result.orders) == limit
+        counts.append(stats.count)
+
+    # Страница и общее количество - два запроса при любом размере страницы
+    assert counts == [2] * len(PAGE_SIZES), counts
+
+
+async def test_get_orders_cursor_page_query_count(seeded, session):
+    service = OrderService(session)
+    first_page = await service.get_orders(user=seeded.users["admin"], limit=10)
+
+    with count_queries(2):
+        second_page = await service.get_orders(user=seeded.users["admin"], limit=10, after=first_page.next_cursor)
+
+    assert second_page.orders[0].id < first_page.orders[-1].id
+
+
+async def test_get_today_orders_is_one_query(seeded, session):
+    with count_queries(1):
+        orders = await OrderService(session).get_today_orders()
+    assert len(orders) == SEED_ORDERS
+
+
+async def test_get_order_by_id_is_one_query(seeded, session):
+    with count_queries(1):
+        order = await OrderService(session).get_order_by_id_async(seeded.order_ids[0])
+    assert order.customerCar.car.brand == "Toyota"
+
+
+async def test_get_orders_rejects_unknown_status(seeded, session):
+    with pytest.raises(HTTPException) as error:
+        await OrderService(session).get_orders(user=seeded.users["admin"], status=7)
+    assert error.value.status_code == 400
@@ -0,0 +1,186 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete, func, insert, select, text, update
+
+from catalog.cache import catalog_cache
+from database import async_session_maker, engine
+from orders.backfill import backfill_order_totals, upgrade_order_schema
+from orders.models import Order, OrderService as OrderServiceRow, OrderStatus
+from orders.order_service import OrderService
+from orders.schemas import OrderCreate, ServiceId
+from service.models import Service
+from service.schemas import ServiceCreate
+from service.service import ServiceService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def priced_service(seeded):
+    # Своя услуга: цену меняем, не трогая общие данные
+    async with async_session_maker() as session:
+        service_id = await session.scalar(
+            insert(Service).values(name="Полировка", price_kopecks=150000, time_seconds=1800).returning(Service.id)
+        )
+        await session.commit()
+    catalog_cache.invalidate("services")
+    order_ids = []
+    yield service_id, order_ids
+    async with async_session_maker() as session:
+        await session.execute(
+            delete(OrderServiceRow).where(
+                (OrderServiceRow.service_id == service_id) | OrderServiceRow.order_id.in_(order_ids)
+            )
+        )
+        await session.execute(delete(Order).where(Order.id.in_(order_ids)))
+        await session.execute(delete(Service).where(Service.id == service_id))
+        await session.commit()
+    catalog_cache.invalidate("services")
+
+
+async def test_price_change_keeps_historical_order_totals(seeded, priced_service):
+    service_id, order_ids = priced_service
+    async with async_session_maker() as session:
+        created = await OrderService(session).create_order(
+            OrderCreate(
+                customer_car_id=seeded.customer_car_id,
+                employee_id=seeded.users["employee"].id,
+                services=[ServiceId(service_id=service_id)],
+            ),
+            administrator_id=seeded.users["admin"].id,
+        )
+    order_ids.append(created["id"])
+    assert (created["totalPrice"], created["totalTime"]) == (1500, 30)
+
+    async with async_session_maker() as session:
+        await ServiceService(session).update_service(service_id, ServiceCreate(name="Полировка", price=2500, time=45))
+
+    async with async_session_maker() as session:
+        order = await OrderService(session).get_order_by_id_async(created["id"])
+        row = (
+            await session.execute(
+                select(OrderServiceRow.price_kopecks, OrderServiceRow.time_seconds)
+                .where(OrderServiceRow.order_id == created["id"])
+            )
+        ).one()
+    assert (order.totalPrice, order.totalTime) == (1500, 30)
+    assert tuple(row) == (150000, 1800)
+
+
+async def test_booking_snapshots_the_database_price_not_the_cached_one(seeded, priced_service):
+    service_id, order_ids = priced_service
+    cached = await catalog_cache.services_by_id()
+    assert cached[service_id].price_kopecks == 150000
+    async with async_session_maker() as session:
+        # Прайс изменён, а NOTIFY до этого воркера ещё не дошёл
+        await session.execute(update(Service).where(Service.id == service_id).values(price_kopecks=170000))
+        await session.commit()
+    assert (await catalog_cache.services_by_id())[service_id].price_kopecks == 150000
+
+    order_data = OrderCreate(
+        customer_car_id=seeded.customer_car_id,
+        employee_id=seeded.users["employee"].id,
+        services=[ServiceId(service_id=service_id)],
+    )
+    async with async_session_maker() as session:
+        created = await OrderService(session).create_order(order_data, administrator_id=seeded.users["admin"].id)
+    async with async_session_maker() as session:
+        bulk = await OrderService(session).create_orders_bulk([order_data], administrator_id=seeded.users["admin"].id)
+    order_ids.extend([created["id"], bulk.results[0].id])
+
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(OrderServiceRow.price_kopecks, Order.total_price_kopecks)
+            .join(Order, Order.id == OrderServiceRow.order_id)
+            .where(Order.id.in_(order_ids))
+        )
+        assert result.all() == [(170000, 170000)] * 2
+
+
+async def test_backfill_fills_missing_snapshots_and_totals(seeded, priced_service):
+    service_id, order_ids = priced_service
+    async with async_session_maker() as session:
+        # Заказ из базы до снимков: цены в строках нет, итоги нулевые
+        order_id = await session.scalar(
+            insert(Order)
+            .values(
+                status=OrderStatus.completed,
+                customer_car_id=seeded.customer_car_id,
+                employee_id=seeded.users["employee"].id,
+                administrator_id=seeded.users["admin"].id,
+                start_date=datetime(2020, 1, 1, 10, 0),
+                end_date=datetime(2020, 1, 1, 11, 0),
+            )
+            .returning(Order.id)
+        )
+        order_ids.append(order_id)
+        await session.execute(
+            insert(OrderServiceRow),
+            [
+                {"order_id": order_id, "service_id": service_id},
+                {"order_id": order_id, "service_id": seeded.service_ids[0], "price_kopecks": 1000, "time_seconds": 60},
+            ],
+        )
+        seeded_totals = (
+            await session.execute(
+                select(func.sum(Order.total_price_kopecks), func.sum(Order.total_time_seconds))
+                .where(Order.id.in_(seeded.order_ids))
+            )
+        ).one()
+        await session.commit()
+
+    await backfill_order_totals(batch_size=7)
+
+    async with async_session_maker() as session:
+        order = await session.get(Order, order_id)
+        rows = dict(
+            (
+                await session.execute(
+                    select(OrderServiceRow.service_id, OrderServiceRow.price_kopecks).where(OrderServiceRow.order_id == order_id)
+                )
+            ).all()
+        )
+        after = (
+            await session.execute(
+                select(func.sum(Order.total_price_kopecks), func.sum(Order.total_time_seconds))
+                .where(Order.id.in_(seeded.order_ids))
+            )
+        ).one()
+    # Пустой снимок берётся из текущего прайса, заполненный не меняется
+    assert rows == {service_id: 150000, seeded.service_ids[0]: 1000}
+    assert (order.total_price_kopecks, order.total_time_seconds) == (151000, 1860)
+    assert tuple(after) == tuple(seeded_totals)
+
+
+async def test_schema_upgrade_on_a_pre_snapshot_database(seeded):
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        try:
+            # Схема до снимков; DDL в Postgres транзакционный и откатывается в конце теста
+            await connection.execute(text(
+                "ALTER TABLE order_service DROP CONSTRAINT uq_order_service_order_id_service_id, "
+                "DROP COLUMN price_kopecks, DROP COLUMN time_seconds"
+            ))
+            await connection.execute(text("ALTER TABLE orders DROP COLUMN total_time_seconds, DROP COLUMN total_price_kopecks"))
+            pair = {"order_id": seeded.order_ids[0], "service_id": seeded.service_ids[0]}
+            await connection.execute(
+                text("INSERT INTO order_service (order_id, service_id) VALUES (:order_id, :service_id)"), pair
+            )
+
+            await upgrade_order_schema(connection)
+            # Повторный запуск ничего не ломает
+            await upgrade_order_schema(connection)
+
+            duplicates = await connection.scalar(
+                select(func.count()).select_from(OrderServiceRow).where(
+                    OrderServiceRow.order_id == pair["order_id"], OrderServiceRow.service_id == pair["service_id"]
+                )
+            )
+            assert duplicates == 1
+            assert await connection.scalar(select(func.min(Order.total_price_kopecks))) == 0
+            assert await connection.scalar(
+                text("SELECT count(*) FROM pg_constraint WHERE conname = 'uq_order_service_order_id_service_id'")
+            ) == 1
+        finally:
+            await transaction.rollback()
@@ -0,0 +1,144 @@
+import smtplib
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, insert, select, update
+
+from auth.models import User
+from database import async_session_maker
+from notifications import outbox
+from notifications.models import NotificationOutbox, OutboxStatus
+from orders.models import Order, OrderStatus
+from orders.order_service import OrderService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def outbox_rows(database):
+    async with async_session_maker() as session:
+        await session.execute(delete(NotificationOutbox))
+        await session.execute(
+            insert(NotificationOutbox),
+            [
+                {"order_id": 1, "email": "sent@example.com", "first_name": "Клиент"},
+                {"order_id": 2, "email": "later@example.com", "first_name": "Клиент"},
+                {"order_id": 3, "email": "broken@example.com", "first_name": "Клиент"},
+            ],
+        )
+        await session.commit()
+
+
+async def test_drain_outbox_sends_outside_the_claim_transaction(outbox_rows, monkeypatch):
+    sends = []
+
+    async def fake_send(message, retry=True):
+        sends.append((message["To"], retry))
+        # Захват уже закоммичен: строки видны другим соединениям и не заблокированы
+        async with async_session_maker() as other_session:
+            row = await other_session.scalar(
+                select(NotificationOutbox)
+                .where(NotificationOutbox.email == message["To"])
+                .with_for_update(nowait=True)
+            )
+            assert row.attempts == 1
+            assert row.available_at > datetime.utcnow()
+        if message["To"] == "later@example.com":
+            raise smtplib.SMTPResponseException(451, "Try again later")
+        if message["To"] == "broken@example.com":
+            raise smtplib.SMTPResponseException(550, "No such user")
+
+    monkeypatch.setattr(outbox.email_dispatcher, "send", fake_send)
+    async with async_session_maker() as session:
+        assert await outbox.drain_outbox(session) == 3
+
+    assert sorted(sends) == [
+        ("broken@example.com", False),
+        ("later@example.com", False),
+        ("sent@example.com", False),
+    ]
+    async with async_session_maker() as session:
+        rows = {row.email: row for row in (await session.scalars(select(NotificationOutbox))).all()}
+    assert rows["sent@example.com"].status == OutboxStatus.sent
+    assert rows["later@example.com"].status == OutboxStatus.pending
+    assert rows["later@example.com"].available_at > datetime.utcnow()
+    assert rows["broken@example.com"].status == OutboxStatus.failed
+    assert all(row.attempts == 1 for row in rows.values())
+
+    async with async_session_maker() as session:
+        assert await outbox.drain_outbox(session) == 0
+
+
+async def test_purge_outbox_keeps_pending_and_recent_rows(database):
+    old = datetime.utcnow() - timedelta(days=30)
+    async with async_session_maker() as session:
+        await session.execute(delete(NotificationOutbox))
+        await session.execute(
+            insert(NotificationOutbox),
+            [
+                {"order_id": 1, "email": "old-sent@example.com", "first_name": "Клиент", "status": OutboxStatus.sent, "available_at": old},
+                {"order_id": 2, "email": "old-failed@example.com", "first_name": "Клиент", "status": OutboxStatus.failed, "available_at": old},
+                {"order_id": 3, "email": "old-pending@example.com", "first_name": "Клиент", "available_at": old},
+                {"order_id": 4, "email": "new-sent@example.com", "first_name": "Клиент", "status": OutboxStatus.sent},
+            ],
+        )
+        await session.commit()
+
+        assert await outbox.purge_outbox(session, retention_days=0) == 0
+        assert await outbox.purge_outbox(session, retention_days=7) == 2
+        emails = set((await session.scalars(select(NotificationOutbox.email))).all())
+    assert emails == {"old-pending@example.com", "new-sent@example.com"}
+
+
+@pytest.fixture
+async def overdue_order(seeded):
+    # Просроченный заказ клиента, которому нужны уведомления
+    async with async_session_maker() as session:
+        await session.execute(delete(NotificationOutbox))
+        await session.execute(update(User).where(User.id == seeded.users["client"].id).values(is_send_notify=True))
+        order_id = await session.scalar(
+            insert(Order)
+            .values(
+                status=OrderStatus.in_progress,
+                customer_car_id=seeded.customer_car_id,
+                employee_id=seeded.users["employee"].id,
+                administrator_id=seeded.users["admin"].id,
+                start_date=datetime.utcnow() - timedelta(hours=2),
+                end_date=datetime.utcnow() - timedelta(hours=1),
+                total_time_seconds=3600,
+                total_price_kopecks=100000,
+            )
+            .returning(Order.id)
+        )
+        await session.commit()
+    yield order_id
+    async with async_session_maker() as session:
+        await session.execute(delete(NotificationOutbox))
+        await session.execute(delete(Order).where(Order.id == order_id))
+        await session.execute(
+            update(User).where(User.id == seeded.users["client"].id).values(is_send_notify=seeded.users["client"].is_send_notify)
+        )
+        await session.commit()
+
+
+async def order_state(order_id: int):
+    async with async_session_maker() as session:
+        status = await session.scalar(select(Order.status).where(Order.id == order_id))
+        emails = (await session.scalars(select(NotificationOutbox.email).where(NotificationOutbox.order_id == order_id))).all()
+    return status, emails
+
+
+async def test_status_flip_and_outbox_rows_commit_together(overdue_order):
+    async def failing_commit():
+        raise RuntimeError("commit failed")
+
+    async with async_session_maker() as session:
+        session.commit = failing_commit
+        with pytest.raises(RuntimeError):
+            await OrderService(session).update_order_statuses()
+    # Коммит не прошёл: откатились и статус, и письмо
+    assert await order_state(overdue_order) == (OrderStatus.in_progress, [])
+
+    async with async_session_maker() as session:
+        assert await OrderService(session).update_order_statuses() == 1
+    assert await order_state(overdue_order) == (OrderStatus.completed, ["client@example.com"])
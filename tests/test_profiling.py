@@ -0,0 +1,69 @@
+import time
+
+import httpx
+import pytest
+
+from monitoring import profiling
+from monitoring.profiling import ProfilingMiddleware, StackSampler
+
+pytestmark = pytest.mark.anyio
+
+TOKEN = "test-profile-token"
+
+
+def busy_handler(seconds: float) -> None:
+    # Синхронная работа в потоке event loop - её и должен увидеть сэмплер
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+async def slow_app(scope, receive, send):
+    busy_handler(0.05)
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+@pytest.fixture
+def profiled_client(tmp_path, monkeypatch):
+    # Middleware подключается в main только при PROFILING_ENABLED, поэтому оборачиваем своё приложение
+    monkeypatch.setattr(profiling, "PROFILING_HEADER_TOKEN", TOKEN)
+    monkeypatch.setattr(profiling, "PROFILING_DIR", str(tmp_path))
+    monkeypatch.setattr(profiling, "sampler", StackSampler(0.001))
+    monkeypatch.setattr(profiling.settings, "sample_rate", 0.0)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=ProfilingMiddleware(slow_app)), base_url="http://test")
+
+
+async def test_profile_header_writes_collapsed_stacks(profiled_client, tmp_path):
+    async with profiled_client as client:
+        response = await client.get("/orders/today", headers={"X-Profile": TOKEN})
+    assert response.status_code == 200
+
+    profile_id = response.headers["x-profile-id"]
+    assert profile_id.endswith("GET-orders_today")
+    files = list(tmp_path.iterdir())
+    assert len(files) == 1
+    assert files[0].name.startswith(profile_id) and files[0].name.endswith(".collapsed")
+
+    lines = files[0].read_text().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert any("busy_handler" in line for line in lines)
+
+
+@pytest.mark.parametrize("headers", [{}, {"X-Profile": "wrong-token"}])
+async def test_requests_without_valid_header_are_not_profiled(profiled_client, tmp_path, headers):
+    async with profiled_client as client:
+        response = await client.get("/orders/today", headers=headers)
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+    assert list(tmp_path.iterdir()) == []
+
+
+async def test_profiles_are_rotated(profiled_client, tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING_MAX_FILES", 2)
+    async with profiled_client as client:
+        for _ in range(4):
+            await client.get("/services/", headers={"X-Profile": TOKEN})
+    assert len(list(tmp_path.iterdir())) == 2
@@ -0,0 +1,87 @@
+import time
+from http.cookies import SimpleCookie
+
+import pytest
+from fastapi import Request, Response
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+import database as database_module
+from database import DATABASE_URL, READ_YOUR_WRITES_COOKIE, engine
+from main import read_your_writes
+
+pytestmark = pytest.mark.anyio
+
+REPLICA_APPLICATION_NAME = "car-wash-replica"
+
+
+@pytest.fixture
+async def replica(database, monkeypatch):
+    # Тот же сервер под вторым DSN, как DB_REPLICA_*: соединения реплики отличаются application_name
+    replica_engine = create_async_engine(
+        DATABASE_URL,
+        poolclass=NullPool,
+        connect_args={"server_settings": {"application_name": REPLICA_APPLICATION_NAME}},
+    )
+    statements = {"primary": [], "replica": []}
+
+    def recorder(name):
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if "FROM orders" in statement:
+                statements[name].append(statement)
+        return before_cursor_execute
+
+    listeners = [(engine.sync_engine, recorder("primary")), (replica_engine.sync_engine, recorder("replica"))]
+    for target, listener in listeners:
+        event.listen(target, "before_cursor_execute", listener)
+    monkeypatch.setattr(
+        database_module, "async_read_session_maker", sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False)
+    )
+    monkeypatch.setattr(database_module, "READ_YOUR_WRITES_SECONDS", 30)
+    yield statements
+    for target, listener in listeners:
+        event.remove(target, "before_cursor_execute", listener)
+    await replica_engine.dispose()
+
+
+def recent_write_cookie() -> str:
+    return str(int(time.time()) + 30)
+
+
+async def test_replica_dsn_is_a_separate_connection(replica):
+    async with database_module.async_read_session_maker() as session:
+        assert await session.scalar(text("SELECT current_setting('application_name')")) == REPLICA_APPLICATION_NAME
+
+
+@pytest.mark.parametrize("path", ["/orders/{order_id}", "/orders/export"])
+async def test_reads_go_to_replica(seeded, client_as, replica, path):
+    client = await client_as("admin")
+    response = await client.get(path.format(order_id=seeded.order_ids[0]))
+    assert response.status_code == 200
+    assert replica["replica"] and not replica["primary"]
+
+
+@pytest.mark.parametrize("path", ["/orders/{order_id}", "/orders/export"])
+async def test_recent_writer_reads_from_primary(seeded, client_as, replica, path):
+    client = await client_as("admin")
+    client.cookies.set(READ_YOUR_WRITES_COOKIE, recent_write_cookie())
+    response = await client.get(path.format(order_id=seeded.order_ids[0]))
+    assert response.status_code == 200
+    assert replica["primary"] and not replica["replica"]
+
+
+@pytest.mark.parametrize(("method", "status_code", "marked"), [("POST", 201, True), ("POST", 400, False), ("GET", 200, False)])
+async def test_read_your_writes_marks_successful_writes(replica, method, status_code, marked):
+    # Middleware подключается в main только при READ_YOUR_WRITES_SECONDS > 0, поэтому вызывается напрямую
+    async def call_next(request):
+        return Response(status_code=status_code)
+
+    request = Request({"type": "http", "method": method, "path": "/orders/", "headers": []})
+    response = await read_your_writes(request, call_next)
+    cookies = SimpleCookie(response.headers.get("set-cookie", ""))
+    if marked:
+        assert int(cookies[READ_YOUR_WRITES_COOKIE].value) > time.time()
+    else:
+        assert READ_YOUR_WRITES_COOKIE not in cookies
@@ -0,0 +1,52 @@
+import pytest
+
+from catalog.cache import catalog_cache
+from catalog.suggest import suggest_index
+from catalog.suggest_service import SuggestService
+from monitoring.sql_stats import count_queries, install_sql_stats
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+async def fresh_index(seeded):
+    # Слушателя NOTIFY в тестах нет: индексы перечитываются с текущих данных
+    install_sql_stats()
+    catalog_cache.invalidate()
+    await suggest_index.load_all()
+
+
+def labels(response) -> list[tuple[str, str]]:
+    return [(item.type, item.label) for item in response.items]
+
+
+async def test_suggest_answers_prefixes_from_the_index(session):
+    service = SuggestService(session)
+    with count_queries(0):
+        assert labels(await service.suggest("to")) == [("brand", "Toyota"), ("car", "Toyota Camry")]
+        assert labels(await service.suggest("ca")) == [("car", "Toyota Camry")]
+        assert labels(await service.suggest("а1")) == [("plate", "А123ВС")]
+    # Номер из индекса находится и с пробелом; в Postgres уходят только виды без совпадений
+    with count_queries(1):
+        assert labels(await service.suggest("а 12")) == [("plate", "А123ВС")]
+
+
+async def test_suggest_falls_back_to_substring_search(session):
+    with count_queries(1):
+        response = await SuggestService(session).suggest("amr")
+    assert labels(response) == [("car", "Toyota Camry")]
+
+
+async def test_suggest_without_index_matches_plates_ignoring_spaces(session, monkeypatch):
+    monkeypatch.setattr(suggest_index, "enabled", False)
+    service = SuggestService(session)
+    with count_queries(1):
+        assert labels(await service.suggest("а 123")) == [("plate", "А123ВС")]
+    assert labels(await service.suggest("23 вс")) == [("plate", "А123ВС")]
+
+
+@pytest.mark.parametrize(("role", "status_code"), [("admin", 200), ("employee", 200), ("client", 403)])
+async def test_suggest_is_limited_to_staff(client_as, role, status_code):
+    client = await client_as(role)
+    response = await client.get("/catalog/suggest", params={"q": "а"})
+    assert response.status_code == status_code
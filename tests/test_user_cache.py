@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+from fastapi_users import schemas
+from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
+
+from auth import cache, manager
+from auth.cache import UserCache, publish_user_change, run_user_listener, user_cache
+from auth.manager import UserManager
+from auth.models import User
+from database import async_session_maker
+
+pytestmark = pytest.mark.anyio
+
+
+def make_user(user_id: int, role_id: int = 1) -> User:
+    return User(id=user_id, email=f"user{user_id}@example.com", role_id=role_id, is_active=True)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_user_cache_hit_returns_a_detached_copy(clock):
+    user_cache = UserCache(max_size=10, ttl_seconds=60)
+    user = make_user(1)
+    user_cache.set("token", user)
+    user.role_id = 3
+
+    cached = user_cache.get("token")
+    assert cached is not user
+    assert cached.role_id == 1
+    assert (user_cache.hits, user_cache.misses) == (1, 0)
+
+
+def test_user_cache_expires_by_ttl_and_token_exp(clock):
+    user_cache = UserCache(max_size=10, ttl_seconds=60)
+    user_cache.set("long", make_user(1))
+    user_cache.set("short", make_user(2), token_expires_at=clock[0] + 10)
+
+    clock[0] += 30
+    assert user_cache.get("short") is None
+    assert user_cache.get("long") is not None
+    clock[0] += 31
+    assert user_cache.get("long") is None
+    assert len(user_cache) == 0
+
+
+def test_user_cache_evicts_least_recently_used(clock):
+    user_cache = UserCache(max_size=2, ttl_seconds=60)
+    user_cache.set("a", make_user(1))
+    user_cache.set("b", make_user(2))
+    user_cache.get("a")
+    user_cache.set("c", make_user(3))
+
+    assert user_cache.get("b") is None
+    assert user_cache.get("a") is not None
+
+
+def test_invalidate_user_drops_every_token_of_that_user(clock):
+    user_cache = UserCache(max_size=10, ttl_seconds=60)
+    user_cache.set("phone", make_user(1))
+    user_cache.set("laptop", make_user(1))
+    user_cache.set("other", make_user(2))
+
+    user_cache.invalidate_user(1)
+    assert user_cache.get("phone") is None
+    assert user_cache.get("laptop") is None
+    assert user_cache.get("other") is not None
+
+
+@pytest.fixture
+async def user_listener(database):
+    user_cache.clear()
+    task = asyncio.create_task(run_user_listener())
+    yield
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    user_cache.clear()
+
+
+async def wait_until_dropped(token: str, user: User, change) -> None:
+    # NOTIFY до LISTEN теряется: пока слушатель подключается, повторяем изменение
+    for _ in range(50):
+        user_cache.set(token, user)
+        await change()
+        await asyncio.sleep(0.1)
+        if user_cache.get(token) is None:
+            return
+    raise AssertionError("Запись кэша не сброшена по NOTIFY")
+
+
+async def test_notification_from_another_worker_drops_cached_user(seeded, user_listener):
+    user = seeded.users["admin"]
+    user_cache.set("bystander", seeded.users["client"])
+
+    async def change_elsewhere():
+        # Изменение в другом воркере: локальный invalidate_user здесь не вызывается
+        async with async_session_maker() as session:
+            await publish_user_change(session, user.id)
+            await session.commit()
+
+    await wait_until_dropped("admin-token", user, change_elsewhere)
+    assert user_cache.get("bystander") is not None
+
+
+async def test_user_manager_update_notifies_every_worker(seeded, user_listener, monkeypatch):
+    user = seeded.users["employee"]
+    # Локальная инвалидация уходит в чужой кэш: запись здесь сбрасывает только NOTIFY
+    monkeypatch.setattr(manager, "user_cache", UserCache(max_size=10, ttl_seconds=60))
+
+    async def update_user():
+        async with async_session_maker() as session:
+            user_manager = UserManager(SQLAlchemyUserDatabase(session, User))
+            await user_manager.update(schemas.BaseUserUpdate(is_active=True), await user_manager.get(user.id))
+
+    await wait_until_dropped("employee-token", user, update_user)